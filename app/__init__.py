@@ -1,16 +1,96 @@
+import importlib
+import os
+
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from config import Config
-import os
+from app.emoji_buffer import EmojiWriteBuffer
+from app.live_counters import LiveCounters
+from app.chart_cache import ChartCache
+from app.chart_renderer import ChartRenderer
+from app.live_feed import LiveFeed
+from app.search_index import SearchIndex
+from app.metrics import Metrics
+from app.analytics_log import AnalyticsLog
 
 # 获取项目根目录的绝对路径
 base_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
 static_folder = os.path.join(base_dir, 'static')
-app = Flask(__name__, static_folder=static_folder)
-app.config.from_object(Config)
 
-db = SQLAlchemy(app)
-migrate = Migrate(app, db)
+# 扩展对象在模块级创建，create_app 时绑定到应用（每个进程只创建一个应用）
+db = SQLAlchemy()
+emoji_buffer = EmojiWriteBuffer()
+live_counters = LiveCounters()
+chart_cache = ChartCache()
+chart_renderer = ChartRenderer()
+live_feed = LiveFeed()
+search_index = SearchIndex()
+metrics = Metrics()
+analytics_log = AnalyticsLog()
+
+# 蓝图所在模块，只有被某个配置用到时才导入
+BLUEPRINTS = {
+    'auth': 'app.routes',
+    'student': 'app.routes_1',
+    'teacher': 'app.routes_teacher',
+    'admin': 'app.routes_admin',
+    'analytics': 'app.routes_analytics',
+}
+
+# 各配置注册的蓝图
+# full：全部功能；ingest：只有登录注册和学生端，用于按负载快速扩容的表情写入节点，
+# 不导入管理、统计图表、数据库迁移和命令行相关的模块
+PROFILES = {
+    'full': ('auth', 'student', 'teacher', 'admin', 'analytics'),
+    'ingest': ('auth', 'student'),
+}
+
+
+def create_app(profile=None, config_object=Config):
+    """
+    创建应用。profile 缺省取配置项 APP_PROFILE（环境变量同名），可选 full / ingest
+    gunicorn 'app:create_app("ingest")' 启动只处理学生发送表情的节点
+    """
+    app = Flask(__name__, static_folder=static_folder)
+    app.config.from_object(config_object)
+    profile = profile or app.config.get('APP_PROFILE') or 'full'
+    if profile not in PROFILES:
+        raise ValueError(f'未知的应用配置: {profile}，可选 {", ".join(PROFILES)}')
+    app.config['APP_PROFILE'] = profile
+
+    db.init_app(app)
+    emoji_buffer.init_app(app, db)
+    live_counters.init_app(app, db)
+    live_feed.init_app(app)
+    metrics.init_app(app)
+
+    if profile == 'full':
+        from flask_migrate import Migrate
+        from app import commands
+
+        Migrate(app, db)
+        chart_cache.init_app(app)
+        chart_renderer.init_app(app)
+        search_index.init_app(app, db)
+        analytics_log.init_app(app)
+        app.register_blueprint(commands.bp)
+
+    for name in PROFILES[profile]:
+        app.register_blueprint(importlib.import_module(BLUEPRINTS[name]).bp)
+
+    return app
+
+
+from app import models, rollup
+
+# 表情写入与汇总表更新在同一事务内完成
+emoji_buffer.before_commit(rollup.record)
+emoji_buffer.after_commit(live_counters.record)
+emoji_buffer.after_commit(live_feed.publish)
 
-from app import routes, models,routes_1
+# 性能指标：图表渲染耗时、缓存命中和实时推送连接数
+chart_renderer.after_render(metrics.observe_chart_render)
+metrics.register_value('selab_chart_cache_hits_total', '图表缓存命中次数', lambda: chart_cache.hits, 'counter')
+metrics.register_value('selab_chart_cache_misses_total', '图表缓存未命中次数', lambda: chart_cache.misses, 'counter')
+metrics.register_value('selab_live_feed_subscribers', '当前 SSE 实时推送连接数', live_feed.subscriber_count)
+metrics.register_value('selab_analytics_log_dropped_total', '统计分析日志队列满时丢弃的条数', lambda: analytics_log.dropped, 'counter')
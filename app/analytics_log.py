@@ -0,0 +1,144 @@
+# app/analytics_log.py
+"""
+统计分析模块的结构化日志
+
+图表、报表的诊断信息（查询窗口、数据量、逐小时明细）以前直接 print 到标准输出，每个请求同步写很多行。
+现在统一写到 logger 'app.analytics'，每条日志是一行 JSON（事件名 + 字段）：
+- WARNING 及以上总是输出；INFO / DEBUG 受 ANALYTICS_LOG_LEVEL 控制，并且只对抽样的请求输出
+  （ANALYTICS_LOG_SAMPLE_RATE，每个请求只抽样一次，同一请求的日志要么全有要么全无）
+- 管理员在请求上加 ?analytics_debug=1 时，不论级别和抽样，输出该请求的全部诊断信息
+- ANALYTICS_LOG_ASYNC = True 时日志先进入有界队列，由后台线程写出，请求线程不等待 I/O；队列满时丢弃并计数
+
+缺省配置（WARNING、抽样率 0）下，enabled() 在组装字段之前就返回 False，几乎没有开销。
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import threading
+
+from flask import g, has_request_context, request, session
+
+LOGGER_NAME = 'app.analytics'
+
+
+class JsonFormatter(logging.Formatter):
+    """一条日志一行 JSON：时间、级别、事件名和 record.fields 中的字段"""
+
+    def format(self, record):
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'event': record.getMessage(),
+        }
+        data.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """队列满时丢弃日志而不是阻塞请求线程"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+
+class AnalyticsLog:
+    def __init__(self, app=None):
+        self.logger = logging.getLogger(LOGGER_NAME)
+        self.sample_rate = 0.0
+        self._handler = None
+        self._output = None
+        self._listener = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('ANALYTICS_LOG_LEVEL', 'WARNING')
+        app.config.setdefault('ANALYTICS_LOG_SAMPLE_RATE', 0.0)
+        app.config.setdefault('ANALYTICS_LOG_FILE', None)
+        app.config.setdefault('ANALYTICS_LOG_ASYNC', False)
+        app.config.setdefault('ANALYTICS_LOG_QUEUE_SIZE', 10000)
+
+        self.sample_rate = float(app.config['ANALYTICS_LOG_SAMPLE_RATE'])
+        self.logger.setLevel(app.config['ANALYTICS_LOG_LEVEL'])
+        self.logger.propagate = False
+
+        if app.config['ANALYTICS_LOG_FILE']:
+            output = logging.FileHandler(app.config['ANALYTICS_LOG_FILE'], encoding='utf-8')
+        else:
+            output = logging.StreamHandler()
+        output.setFormatter(JsonFormatter())
+
+        self.close()
+        self._output = output
+        if app.config['ANALYTICS_LOG_ASYNC']:
+            self._handler = DroppingQueueHandler(queue.Queue(maxsize=app.config['ANALYTICS_LOG_QUEUE_SIZE']))
+            self._listener = logging.handlers.QueueListener(self._handler.queue, output)
+            self._listener.start()
+        else:
+            self._handler = output
+        self.logger.addHandler(self._handler)
+
+        app.extensions['analytics_log'] = self
+        atexit.register(self.close)
+
+    @property
+    def dropped(self):
+        """异步模式下因队列满而丢弃的日志条数"""
+        return getattr(self._handler, 'dropped', 0)
+
+    def enabled(self, level=logging.DEBUG):
+        """当前请求是否输出 level 级别的日志；组装开销较大的字段前先调用"""
+        if level >= logging.WARNING:
+            return self.logger.isEnabledFor(level)
+        if not has_request_context():
+            return self.logger.isEnabledFor(level)
+        decision = g.get('analytics_log')
+        if decision is None:
+            decision = g.analytics_log = self._decide()
+        return decision == 'forced' or (decision == 'sampled' and self.logger.isEnabledFor(level))
+
+    def event(self, name, level=logging.INFO, **fields):
+        """输出一条结构化日志：name 为事件名，fields 为附加字段"""
+        if not self.enabled(level):
+            return
+        record = self.logger.makeRecord(self.logger.name, level, __file__, 0, name, None, None,
+                                        extra={'fields': fields})
+        # 用 handle 而不是 log：管理员强制输出时绕过 logger 的级别
+        self.logger.handle(record)
+
+    def debug(self, name, **fields):
+        self.event(name, logging.DEBUG, **fields)
+
+    def close(self):
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            # 写完队列中剩余的日志
+            listener.stop()
+        handler, self._handler = self._handler, None
+        if handler is not None:
+            self.logger.removeHandler(handler)
+        output, self._output = self._output, None
+        if output is not None:
+            output.close()
+
+    def _decide(self):
+        if request.args.get('analytics_debug') == '1' and session.get('user_type') == 1:
+            return 'forced'
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return 'sampled'
+        return 'skipped'
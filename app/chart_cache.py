@@ -0,0 +1,79 @@
+# app/chart_cache.py
+"""
+图表渲染缓存
+
+以 (课程, 图表类型, 时间窗口, dpi, 数据版本) 为键缓存渲染好的 PNG。
+数据版本是图表输入数据（聚合后的计数）的摘要：数据不变，键就不变，
+同一份图只渲染一次；数据变化后旧条目自然失效，由 LRU 淘汰。
+摘要同时作为导出接口的 ETag。
+"""
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+
+# 修改图表样式时加一，使旧的缓存和浏览器端 ETag 失效
+CHART_STYLE_VERSION = 1
+
+CachedChart = namedtuple('CachedChart', ['png', 'etag'])
+
+
+def chart_key(course_id, kind, window, dpi, data):
+    """根据图表参数和输入数据计算缓存键（同时用作 ETag）"""
+    raw = repr((CHART_STYLE_VERSION, course_id, kind, window, dpi, data))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class ChartCache:
+    """按字节数限制容量的 LRU 缓存"""
+
+    def __init__(self, app=None):
+        self._items = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.max_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CHART_CACHE_MAX_BYTES', 64 * 1024 * 1024)
+        self.max_bytes = app.config['CHART_CACHE_MAX_BYTES']
+        app.extensions['chart_cache'] = self
+
+    def get(self, key):
+        with self._lock:
+            png = self._items.get(key)
+            if png is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return png
+
+    def put(self, key, png):
+        if len(png) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._items[key] = png
+            self._size += len(png)
+            # 超出容量时淘汰最久未使用的条目
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+
+    def get_or_render(self, key, render):
+        """命中直接返回；否则调用 render() 得到 PNG 字节并缓存"""
+        png = self.get(key)
+        if png is None:
+            png = render()
+            self.put(key, png)
+        return CachedChart(png, key)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._size = 0
@@ -0,0 +1,114 @@
+# app/chart_renderer.py
+"""
+图表渲染进程池
+
+matplotlib 的 pyplot 是全局状态机，渲染一张图要几百毫秒，而且在多线程下不安全。
+这里把渲染交给独立的进程池：请求线程只提交聚合后的计数并等待 PNG 字节，
+每个渲染进程启动时加载一次字体（app/figures.py 的 init_worker）。
+
+单张图超过 CHART_RENDER_TIMEOUT 秒仍未完成时取消任务并抛出 ChartRenderError，由图表路由提示用户稍后重试。
+
+本模块不导入 matplotlib，Web 进程只有在 CHART_RENDER_WORKERS = 0（进程内渲染）时才会加载它。
+"""
+import atexit
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+
+class ChartRenderError(Exception):
+    """图表未能在限定时间内渲染完成，消息可直接展示给用户"""
+
+
+def _init_worker():
+    from app import figures
+    figures.init_worker()
+
+
+def _render_task(kind, params):
+    from app import figures
+    return figures.render(kind, params)
+
+
+class ChartRenderer:
+    def __init__(self, app=None):
+        self._pool = None
+        self._lock = threading.Lock()
+        # 进程内渲染时 pyplot 不能并发使用
+        self._inline_lock = threading.Lock()
+        self.workers = 0
+        self.timeout = None
+        self._after_render = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CHART_RENDER_WORKERS', 2)
+        app.config.setdefault('CHART_RENDER_TIMEOUT', 30)
+        app.config.setdefault('CHART_RENDER_MODE', 'client')
+        self.workers = app.config['CHART_RENDER_WORKERS']
+        self.timeout = app.config['CHART_RENDER_TIMEOUT']
+        app.extensions['chart_renderer'] = self
+        atexit.register(self.shutdown)
+
+    def after_render(self, fn):
+        """注册渲染完成后的回调 fn(kind, seconds)，用于统计渲染耗时"""
+        self._after_render.append(fn)
+        return fn
+
+    def render(self, kind, **params):
+        """渲染一张图（kind 为 timeline / bar / pie），返回 PNG 字节"""
+        start = time.perf_counter()
+        png = self._render(kind, params)
+        elapsed = time.perf_counter() - start
+        for fn in self._after_render:
+            fn(kind, elapsed)
+        return png
+
+    def _render(self, kind, params):
+        if self.workers <= 0:
+            return self._render_inline(kind, params)
+
+        future = None
+        try:
+            future = self._get_pool().submit(_render_task, kind, params)
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # 还在排队的任务直接取消；已经开始渲染的无法中断，结果到达后丢弃
+            future.cancel()
+            logger.error('图表渲染超时（%s 秒）：%s', self.timeout, kind)
+            raise ChartRenderError('图表生成超时，请稍后重试') from None
+        except BrokenProcessPool:
+            # 渲染进程异常退出：丢弃进程池（下次重建），本次在进程内渲染
+            logger.exception('图表渲染进程池已损坏，改为进程内渲染')
+            self._reset_pool()
+            return self._render_inline(kind, params)
+
+    def shutdown(self):
+        self._reset_pool()
+
+    def _render_inline(self, kind, params):
+        with self._inline_lock:
+            return _render_task(kind, params)
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # 用 spawn 启动渲染进程，避免 fork 带走 Web 进程中的线程和数据库连接
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker
+                )
+            return self._pool
+
+    def _reset_pool(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,129 @@
+# app/commands.py
+# flask 命令行工具，例如：flask rebuild-rollup --course C001、flask explain-indexes、flask import-users students.csv、flask purge course C001
+from datetime import datetime, timedelta
+
+import click
+from flask import Blueprint
+from sqlalchemy import select, func
+
+from app import db
+from app import rollup
+from app.models import Emoji
+
+# 只在 full 配置中注册；cli_group=None 使命令保持 flask purge 这样的顶层名称
+bp = Blueprint('commands', __name__, cli_group=None)
+
+
+@bp.cli.command('rebuild-rollup')
+@click.option('--course', 'course_id', default=None, help='只重建指定课程，缺省为全部课程')
+def rebuild_rollup(course_id):
+    """从原始 emoji 表重建分钟、小时、天汇总表"""
+    counts = rollup.rebuild(db.session, course_id)
+    db.session.commit()
+    click.echo(f"已重建汇总桶：分钟 {counts['minute']}，小时 {counts['hour']}，天 {counts['day']}")
+
+
+def _analytics_queries():
+    """需要走复合索引的查询：(名称, 语句, 期望使用的索引)"""
+    end_time = datetime.now()
+    start_time = end_time - timedelta(days=7)
+    course_id = 'EXPLAIN'
+    student_id = 'EXPLAIN'
+    bucket = rollup.hour_bucket_expr(Emoji.time, db.engine.dialect.name)
+
+    return [
+        ('课程时间范围按类型计数（柱状图/饼图/曲线图）',
+         select(Emoji.type, func.count(Emoji.type))
+         .where(Emoji.course_id == course_id,
+                Emoji.time.between(start_time, end_time),
+                Emoji.type.between(1, 10))
+         .group_by(Emoji.type),
+         'ix_emoji_course_time_type'),
+        ('课程表情历史 / CSV 导出',
+         select(Emoji.id, Emoji.course_id, Emoji.type, Emoji.time)
+         .where(Emoji.course_id == course_id, Emoji.type.between(1, 10))
+         .order_by(Emoji.time.desc()),
+         'ix_emoji_course_time_type'),
+        ('汇总表重建（按小时分组）',
+         select(Emoji.course_id, bucket, Emoji.type, func.count())
+         .where(Emoji.course_id == course_id, Emoji.time.isnot(None))
+         .group_by(Emoji.course_id, bucket, Emoji.type),
+         'ix_emoji_course_time_type'),
+        ('学生表情历史',
+         select(Emoji)
+         .where(Emoji.student_id == student_id, Emoji.type.between(1, 10))
+         .order_by(Emoji.time.desc()),
+         'ix_emoji_student_time'),
+    ]
+
+
+@bp.cli.command('explain-indexes')
+def explain_indexes():
+    """对各统计查询执行 EXPLAIN，检查执行计划是否使用了预期的索引"""
+    conn = db.session.connection()
+    dialect = conn.dialect
+    explain = 'EXPLAIN QUERY PLAN' if dialect.name == 'sqlite' else 'EXPLAIN'
+
+    failed = 0
+    for name, stmt, index_name in _analytics_queries():
+        compiled = stmt.compile(dialect=dialect)
+        params = compiled.construct_params()
+        if compiled.positional:
+            params = tuple(params[key] for key in compiled.positiontup)
+        plan = conn.exec_driver_sql(f'{explain} {compiled.string}', params).all()
+
+        used = any(index_name in str(value) for row in plan for value in row)
+        failed += not used
+        click.echo(f"[{'OK' if used else '未使用'}] {name}  期望索引: {index_name}")
+        for row in plan:
+            click.echo('    ' + ' | '.join('' if v is None else str(v) for v in row))
+
+    if failed:
+        raise SystemExit(1)
+
+
+@bp.cli.command('import-users')
+@click.argument('csv_file', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--user-type', type=click.IntRange(1, 3), default=3, help='CSV 中没有 user_type 列时使用的类型，缺省为学生')
+@click.option('--dry-run', is_flag=True, help='只校验，不写入')
+def import_users_command(csv_file, user_type, dry_run):
+    """从 CSV 批量导入用户（列：user_id,name,mail,tele_num,password[,user_type]）"""
+    from app.user_import import import_users
+
+    report = import_users(csv_file.read(), default_user_type=user_type, dry_run=dry_run)
+    for error in report.errors:
+        click.echo(f'第 {error.line} 行 {error.user_id}: {error.message}')
+    if not report.ok:
+        click.echo(f'共 {report.total} 行，{len(report.errors)} 行有错误，未导入任何用户')
+        raise SystemExit(1)
+    if dry_run:
+        click.echo(f'共 {report.total} 行，校验通过')
+    else:
+        click.echo(f'成功导入 {report.inserted} 个用户')
+
+
+@bp.cli.command('purge')
+@click.argument('kind', type=click.Choice(['course', 'student', 'teacher']))
+@click.argument('object_id')
+def purge_command(kind, object_id):
+    """分批删除课程、学生或教师及其全部下级数据，并显示进度"""
+    from app import purge
+    from app.models import User, Course
+
+    if kind == 'course':
+        if db.session.get(Course, object_id) is None:
+            raise click.ClickException(f'课程 {object_id} 不存在')
+    else:
+        user = db.session.get(User, object_id)
+        expected = 3 if kind == 'student' else 2
+        if user is None or user.user_type != expected:
+            raise click.ClickException(f'{object_id} 不是{"学生" if kind == "student" else "教师"}')
+
+    def progress(table, total):
+        click.echo(f'  {table}: 已删除 {total} 行')
+
+    try:
+        deleted = getattr(purge, f'purge_{kind}')(object_id, progress)
+    except purge.PurgeError as e:
+        raise click.ClickException(str(e))
+    click.echo('删除完成：' + '，'.join(f'{table} {n} 行' for table, n in sorted(deleted.items())))
@@ -0,0 +1,159 @@
+# app/course_report.py
+"""
+课程统计报告
+
+一个时间窗口内的全部统计只做一次聚合查询：从小时汇总表读出 (整点, 类型, 数量)，
+每种表情的数量、总数、逐小时数量和高峰时段都在 Python 中由这些行推出。
+柱状图、饼图、统计表格和报告下载（ZIP：图表 PNG、逐小时 CSV、JSON 摘要）都从同一个 CourseReport 取数。
+"""
+import csv
+import io
+import json
+import zipfile
+from collections import Counter
+from datetime import datetime, timedelta
+
+from app import rollup
+from config import EMOJI_TYPE_MAP
+
+
+class CourseReport:
+    def __init__(self, course_id, start_time, end_time, type_counts, hourly_rows=None):
+        self.course_id = course_id
+        self.start_time = start_time
+        self.end_time = end_time
+        # {类型: 数量}，1-10 类型全部给出
+        self.type_counts = type_counts
+        # [(整点, 类型, 数量), ...]；只需要分类统计时为 None
+        self.hourly_rows = hourly_rows
+        self.total = sum(type_counts.values())
+
+    @property
+    def emoji_stats(self):
+        """[(类型, 数量), ...]，用于页面表格"""
+        return [(t, self.type_counts[t]) for t in rollup.EMOJI_TYPES]
+
+    def bar_series(self):
+        """柱状图数据：(表情名称列表, 数量列表)，固定 1-10 类型"""
+        labels = [EMOJI_TYPE_MAP.get(t, f'表情 {t}') for t in rollup.EMOJI_TYPES]
+        return labels, [self.type_counts[t] for t in rollup.EMOJI_TYPES]
+
+    def pie_series(self):
+        """饼图数据：[(类型, 数量), ...]，数量为 0 的排在最后"""
+        return sorted(self.emoji_stats, key=lambda x: (x[1] == 0,))
+
+    def hourly_totals(self):
+        """[(整点, {类型: 数量}, 合计), ...]，按时间升序"""
+        by_hour = {}
+        for bucket, emoji_type, n in self.hourly_rows or ():
+            by_hour.setdefault(bucket, Counter())[emoji_type] += n
+        return [(bucket, counts, sum(counts.values())) for bucket, counts in sorted(by_hour.items())]
+
+    def peak_hour(self):
+        """表情最多的整点及其数量，没有数据时为 (None, 0)"""
+        return max(((bucket, total) for bucket, _, total in self.hourly_totals()),
+                   key=lambda x: x[1], default=(None, 0))
+
+    def series(self):
+        """
+        曲线图数据：从 start_time 所在整点到 end_time 所在整点逐小时给出，没有数据的整点补 0，
+        浏览器端按等间隔连线时横轴与时间成比例；counts[i] 为第 i 个整点 1-10 类型各自的数量
+        """
+        types = list(rollup.EMOJI_TYPES)
+        by_hour = {bucket: counts for bucket, counts, _ in self.hourly_totals()}
+        hours = []
+        if by_hour or self.start_time is not None:
+            bucket = rollup.hour_bucket(self.start_time or min(by_hour))
+            last = rollup.hour_bucket(self.end_time or max(by_hour))
+            while bucket <= last:
+                hours.append(bucket)
+                bucket += timedelta(hours=1)
+        empty = Counter()
+        return {
+            'course_id': self.course_id,
+            'types': types,
+            'names': [EMOJI_TYPE_MAP.get(t, f'表情 {t}') for t in types],
+            'hours': [bucket.strftime('%Y-%m-%d %H:00') for bucket in hours],
+            'counts': [[by_hour.get(bucket, empty)[t] for t in types] for bucket in hours],
+        }
+
+    def totals(self):
+        """柱状图、饼图数据：1-10 类型各自的数量和总数"""
+        labels, counts = self.bar_series()
+        return {
+            'course_id': self.course_id,
+            'start_time': _format_time(self.start_time),
+            'end_time': _format_time(self.end_time),
+            'types': list(rollup.EMOJI_TYPES),
+            'names': labels,
+            'counts': counts,
+            'total': self.total,
+        }
+
+    def summary(self):
+        """JSON 摘要"""
+        peak, peak_count = self.peak_hour()
+        return {
+            'course_id': self.course_id,
+            'start_time': _format_time(self.start_time),
+            'end_time': _format_time(self.end_time),
+            'total': self.total,
+            'type_counts': [{'type': t, 'name': EMOJI_TYPE_MAP.get(t, f'表情 {t}'), 'count': n}
+                            for t, n in self.emoji_stats],
+            'peak_hour': _format_time(peak),
+            'peak_hour_count': peak_count,
+        }
+
+    def hourly_csv(self):
+        """逐小时统计 CSV：整点、1-10 类型各一列、合计"""
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(['整点'] + [EMOJI_TYPE_MAP.get(t, f'表情 {t}') for t in rollup.EMOJI_TYPES] + ['合计'])
+        for bucket, counts, total in self.hourly_totals():
+            writer.writerow([_format_time(bucket)] + [counts[t] for t in rollup.EMOJI_TYPES] + [total])
+        return output.getvalue()
+
+
+def build_report(course_id, start_time=None, end_time=None, hourly=True):
+    """
+    计算课程在 [start_time, end_time] 内的统计（缺省为全部时间），只查询一次汇总表
+    hourly=False 时按类型聚合，不取逐小时数据（只需要分类统计时返回的行更少）
+    """
+    if not hourly:
+        return CourseReport(course_id, start_time, end_time,
+                            rollup.type_counts(course_id, start_time, end_time))
+
+    return report_from_hourly(course_id, start_time, end_time,
+                              rollup.hourly_counts(course_id, start_time, end_time))
+
+
+def report_from_hourly(course_id, start_time, end_time, hourly_rows):
+    """由已经取得的 [(整点, 类型, 数量), ...]（例如内存计数环的最近24小时）构造报告"""
+    type_counts = {t: 0 for t in rollup.EMOJI_TYPES}
+    for _, emoji_type, n in hourly_rows:
+        if emoji_type in type_counts:
+            type_counts[emoji_type] += n
+    return CourseReport(course_id, start_time, end_time, type_counts, hourly_rows)
+
+
+def report_archive(report, charts, extra=None):
+    """
+    打包报告：charts 为 {文件名: PNG 字节}，再加上 hourly.csv 和 summary.json（extra 合并进摘要）
+    返回 ZIP 字节
+    """
+    summary = report.summary()
+    summary.update(extra or {})
+    summary['generated_at'] = _format_time(datetime.now())
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, png in charts.items():
+            # PNG 本身已压缩
+            archive.writestr(name, png, compress_type=zipfile.ZIP_STORED)
+        archive.writestr('hourly.csv', report.hourly_csv().encode('utf-8-sig'))
+        archive.writestr('summary.json', json.dumps(summary, ensure_ascii=False, indent=2))
+    return buffer.getvalue()
+
+
+def _format_time(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S') if value is not None else None
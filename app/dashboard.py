@@ -0,0 +1,84 @@
+# app/dashboard.py
+"""
+管理员全部课程概览
+
+每门课程的选课人数、表情总数、各类型分布和最近 24 小时活跃度。
+每项指标对全部课程只做一次分组查询，不按课程逐个查询：
+- 课程与任课教师：课程表左连接用户表
+- 选课人数：选课表按课程分组
+- 表情总数与类型分布：按天汇总表按 (课程, 类型) 分组
+- 最近 24 小时逐小时数量：进程内计数环（由一次查询加载全部课程，见 live_counters）
+结果缓存 ADMIN_DASHBOARD_CACHE_SECONDS 秒，同时过期的请求只有一个去查询。
+"""
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import func
+
+from app import db, live_counters
+from app import rollup
+from app.models import User, Course, Student_Course
+from config import EMOJI_TYPE_MAP
+
+_lock = threading.Lock()
+_cached = None  # (生成时的 monotonic 时间, 数据)
+
+
+def get_dashboard():
+    """返回概览数据，缓存未过期时直接使用缓存"""
+    global _cached
+    ttl = current_app.config['ADMIN_DASHBOARD_CACHE_SECONDS']
+    cached = _cached
+    if cached is not None and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+    with _lock:
+        cached = _cached
+        if cached is not None and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        payload = build_dashboard()
+        _cached = (time.monotonic(), payload)
+        return payload
+
+
+def invalidate():
+    """下次请求时重新查询（删除课程、学生之后调用）"""
+    global _cached
+    _cached = None
+
+
+def build_dashboard():
+    types = list(rollup.EMOJI_TYPES)
+    courses = db.session.query(Course.id, Course.name, Course.teacher_id, User.name) \
+        .outerjoin(User, User.id == Course.teacher_id).order_by(Course.id).all()
+    student_counts = dict(db.session.query(Student_Course.course_id, func.count())
+                          .group_by(Student_Course.course_id).all())
+    type_counts = rollup.all_type_counts()
+    hourly = live_counters.hourly_totals()
+
+    rows = []
+    for course_id, name, teacher_id, teacher_name in courses:
+        counts = type_counts.get(course_id, {})
+        last_24h = hourly.get(course_id, [0] * 24)
+        rows.append({
+            'course_id': course_id,
+            'name': name,
+            'teacher_id': teacher_id,
+            'teacher_name': teacher_name,
+            'student_count': student_counts.get(course_id, 0),
+            'total': sum(counts.values()),
+            'type_counts': [counts.get(t, 0) for t in types],
+            'last_24h': sum(last_24h),
+            'hourly_24h': last_24h,
+        })
+
+    return {
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'types': types,
+        'names': [EMOJI_TYPE_MAP.get(t, f'表情 {t}') for t in types],
+        'course_count': len(rows),
+        'total': sum(row['total'] for row in rows),
+        'last_24h': sum(row['last_24h'] for row in rows),
+        'courses': rows,
+    }
@@ -0,0 +1,206 @@
+# app/emoji_buffer.py
+"""
+Emoji 写缓冲（write-behind）
+
+学生发送的表情先进入内存队列，由后台线程按"每 N 毫秒或每 M 行"
+合并成一次批量 INSERT 提交，避免课堂高峰时每个表情一次事务。
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from sqlalchemy import insert
+
+logger = logging.getLogger(__name__)
+
+
+class BufferFullError(Exception):
+    """缓冲区已满，且在等待时间内没有腾出空间"""
+
+
+class EmojiWriteBuffer:
+    """
+    有界的 Emoji 写缓冲队列
+
+    - 队列容量有上限，满了之后 submit() 会阻塞等待（反压），超时抛出 BufferFullError
+    - 后台线程每 EMOJI_BUFFER_FLUSH_INTERVAL_MS 毫秒或攒够 EMOJI_BUFFER_BATCH_SIZE 行写一次库
+    - 进程退出时（atexit）保证把队列中剩余的数据写完
+    - EMOJI_BUFFER_ENABLED = False 时退化为同步写入
+    """
+
+    def __init__(self, app=None, db=None):
+        self.app = None
+        self.db = None
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._before_commit = []
+        self._after_commit = []
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        app.config.setdefault('EMOJI_BUFFER_ENABLED', True)
+        app.config.setdefault('EMOJI_BUFFER_FLUSH_INTERVAL_MS', 200)
+        app.config.setdefault('EMOJI_BUFFER_BATCH_SIZE', 500)
+        app.config.setdefault('EMOJI_BUFFER_CAPACITY', 10000)
+        app.config.setdefault('EMOJI_BUFFER_PUT_TIMEOUT', 2.0)
+
+        self.app = app
+        self.db = db
+        self.enabled = app.config['EMOJI_BUFFER_ENABLED']
+        self.flush_interval = app.config['EMOJI_BUFFER_FLUSH_INTERVAL_MS'] / 1000.0
+        self.batch_size = app.config['EMOJI_BUFFER_BATCH_SIZE']
+        self.put_timeout = app.config['EMOJI_BUFFER_PUT_TIMEOUT']
+        self.capacity = app.config['EMOJI_BUFFER_CAPACITY']
+        self._queue = queue.Queue(maxsize=self.capacity)
+
+        app.extensions['emoji_buffer'] = self
+        atexit.register(self.close)
+
+    # ---------------- 对外接口 ----------------
+
+    def submit(self, row):
+        """
+        提交一条 Emoji（字典，键为 Emoji 模型的属性名）
+        缓冲关闭时直接同步写入
+        """
+        if not self.enabled:
+            self.write([row])
+            return
+
+        self._ensure_started()
+        try:
+            self._queue.put(row, timeout=self.put_timeout)
+        except queue.Full:
+            raise BufferFullError('Emoji 写缓冲已满')
+
+    @property
+    def max_commit_delay(self):
+        """
+        表情从生成 ID 到提交的最长延迟（秒）的估计：
+        等待入队最多 put_timeout，入队后前面最多有一整个队列，每批 batch_size 行、每个刷新间隔写一批
+        （假设一批写入不超过一个刷新间隔）。缓冲关闭时同步写入，为 0
+        """
+        if not self.enabled:
+            return 0.0
+        batches = -(-self.capacity // self.batch_size) + 1
+        return self.put_timeout + batches * self.flush_interval
+
+    def before_commit(self, fn):
+        """
+        注册回调 fn(session, rows)，在批量 INSERT 之后、提交之前调用
+        回调与写入处于同一事务，用于维护汇总表等派生数据
+        """
+        self._before_commit.append(fn)
+        return fn
+
+    def after_commit(self, fn):
+        """
+        注册回调 fn(rows)，在批量写入提交成功之后调用
+        用于更新内存计数、推送实时事件等；回调出错只记录日志
+        """
+        self._after_commit.append(fn)
+        return fn
+
+    def flush(self):
+        """把队列中当前所有数据同步写入数据库"""
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                return
+            self._flush_batch(batch)
+
+    def close(self):
+        """停止后台线程并写完剩余数据（注册在 atexit 中）"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            thread.join(timeout=max(self.flush_interval * 5, 5))
+        self._thread = None
+        if self._queue is not None:
+            self.flush()
+
+    def write(self, rows):
+        """
+        用一条批量 INSERT 同步写入一批 Emoji 并提交
+        失败时回滚并把异常抛给调用方
+        """
+        from app.models import Emoji
+
+        if not rows:
+            return
+        with self._write_lock, self.app.app_context():
+            session = self.db.session
+            try:
+                # 列表参数走 executemany，PyMySQL 会把它合并成一条多行 INSERT
+                session.execute(insert(Emoji), rows)
+                for fn in self._before_commit:
+                    fn(session, rows)
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+
+        for fn in self._after_commit:
+            try:
+                fn(rows)
+            except Exception:
+                logger.exception('Emoji 写入后的回调 %r 执行失败', fn)
+
+    # ---------------- 内部实现 ----------------
+
+    def _flush_batch(self, rows):
+        try:
+            self.write(rows)
+        except Exception:
+            # 批量失败时通常只是个别行有问题（如课程已被删除），逐条写入避免整批丢失
+            logger.exception('批量写入 %d 条 Emoji 失败，改为逐条写入', len(rows))
+            for row in rows:
+                try:
+                    self.write([row])
+                except Exception:
+                    logger.exception('丢弃无法写入的 Emoji: %r', row)
+
+    def _ensure_started(self):
+        # fork 之后子进程里没有后台线程，需要按 pid 重新启动
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='emoji-write-buffer', daemon=True)
+            self._thread.start()
+
+    def _drain(self, limit):
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            # 攒批：到达时间间隔或达到批大小就写一次
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if batch:
+                self._flush_batch(batch)
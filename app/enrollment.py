@@ -0,0 +1,100 @@
+# app/enrollment.py
+"""
+批量选课
+
+把一批学生加入课程只用一条 INSERT ... SELECT：
+从 user 表选出符合条件的学生，用 NOT EXISTS 反连接跳过已经选过这门课的，
+结果直接插入 student__course，不需要先把已选学生读进 Python，也不需要逐个检查是否已选。
+
+学生来源可以是学号列表（文本框或 CSV），也可以是整批筛选条件：
+学号前缀（例如某一届 2023）或另一门课程的全部学生。
+"""
+import csv
+import io
+import re
+from collections import namedtuple
+
+from sqlalchemy import and_, exists, insert, literal, select
+
+from app import db
+from app.models import User, Student_Course
+
+# 学号列表较长时按段执行，避免 IN 列表过长
+ENROLL_CHUNK_SIZE = 1000
+
+EnrollResult = namedtuple('EnrollResult', ['added', 'already_enrolled', 'unknown_ids'])
+
+
+def not_enrolled(course_id, student_column=User.id):
+    """学生没有选这门课的条件（NOT EXISTS 反连接），可用于查询可添加的学生"""
+    return ~exists().where(and_(Student_Course.student_id == student_column,
+                                Student_Course.course_id == course_id))
+
+
+def parse_student_ids(text):
+    """
+    解析学号列表：每行一个或以逗号、空白分隔；
+    CSV 有 student_id 或 user_id 表头时只取该列。保持顺序并去重
+    """
+    text = (text or '').lstrip('\ufeff')
+    lines = [line for line in text.splitlines() if line.strip()]
+    if not lines:
+        return []
+
+    header = [c.strip().lower() for c in next(csv.reader([lines[0]]))]
+    column = next((header.index(name) for name in ('student_id', 'user_id') if name in header), None)
+    if column is not None:
+        values = [row[column] for row in csv.reader(io.StringIO('\n'.join(lines[1:]))) if len(row) > column]
+    else:
+        values = re.split(r'[\s,，;；]+', text)
+
+    result = []
+    seen = set()
+    for value in values:
+        value = value.strip()
+        if value and value not in seen:
+            seen.add(value)
+            result.append(value)
+    return result
+
+
+def enroll_students(course_id, student_ids=None, id_prefix=None, from_course_id=None):
+    """
+    把学生加入课程，返回 EnrollResult(新增人数, 已选人数, 不存在、不是学生或不满足其它条件的学号)
+    student_ids、id_prefix、from_course_id 至少给出一个，多个条件同时给出时取交集
+    调用方负责提交事务
+    """
+    if student_ids is None and not id_prefix and not from_course_id:
+        raise ValueError('没有指定要添加的学生')
+
+    conditions = [User.user_type == 3]
+    if id_prefix:
+        escaped = id_prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        conditions.append(User.id.like(escaped + '%', escape='\\'))
+    if from_course_id:
+        conditions.append(exists().where(and_(Student_Course.student_id == User.id,
+                                              Student_Course.course_id == from_course_id)))
+
+    if student_ids is None:
+        added = _insert_select(course_id, conditions)
+        matched = db.session.query(User.id).filter(*conditions).count()
+        return EnrollResult(added, matched - added, [])
+
+    added = 0
+    found = set()
+    for i in range(0, len(student_ids), ENROLL_CHUNK_SIZE):
+        chunk = student_ids[i:i + ENROLL_CHUNK_SIZE]
+        chunk_conditions = conditions + [User.id.in_(chunk)]
+        found.update(sid for (sid,) in db.session.query(User.id).filter(*chunk_conditions))
+        added += _insert_select(course_id, chunk_conditions)
+    unknown = [sid for sid in student_ids if sid not in found]
+    return EnrollResult(added, len(found) - added, unknown)
+
+
+def _insert_select(course_id, conditions):
+    # INSERT INTO student__course (Student_ID, Course_ID)
+    # SELECT User_ID, :course_id FROM user WHERE ... AND NOT EXISTS (已选)
+    source = select(User.id, literal(course_id)).where(*conditions, not_enrolled(course_id))
+    statement = insert(Student_Course.__table__).from_select(
+        [Student_Course.__table__.c.Student_ID, Student_Course.__table__.c.Course_ID], source)
+    return db.session.execute(statement).rowcount
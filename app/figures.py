@@ -0,0 +1,265 @@
+# app/figures.py
+"""
+matplotlib 绘图函数
+
+这里的函数只接收聚合后的计数，返回 PNG 字节，不访问数据库。
+通常在渲染进程池（app/chart_renderer.py）中执行，由 init_worker 每个进程加载一次字体。
+渲染进程没有配置日志，诊断信息在 Web 进程提交渲染之前由 analytics_log 输出。
+"""
+import io
+import platform
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import matplotlib.font_manager as fm
+from matplotlib.ticker import MaxNLocator
+import numpy as np
+
+from config import EMOJI_TYPE_MAP
+
+def setup_chinese_font():
+    """设置中文字体支持"""
+    try:
+        # 根据操作系统选择字体
+        if platform.system() == 'Windows':
+            # Windows系统常用中文字体
+            font_paths = [
+                'C:/Windows/Fonts/simhei.ttf',  # 黑体
+                'C:/Windows/Fonts/simsun.ttc',  # 宋体
+                'C:/Windows/Fonts/microsoftyahei.ttf',  # 微软雅黑
+            ]
+        elif platform.system() == 'Darwin':  # macOS
+            font_paths = [
+                '/System/Library/Fonts/PingFang.ttc',  # 苹方
+                '/System/Library/Fonts/STHeiti Light.ttc',  # 华文黑体
+            ]
+        else:  # Linux
+            font_paths = [
+                '/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf',
+                '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc',
+            ]
+        
+        # 尝试加载字体
+        for font_path in font_paths:
+            try:
+                font_prop = fm.FontProperties(fname=font_path)
+                plt.rcParams['font.family'] = font_prop.get_name()
+                plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
+                return True
+            except:
+                continue
+        
+        # 如果找不到字体，使用系统默认字体
+        plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'SimSun', 'Arial Unicode MS']
+        plt.rcParams['axes.unicode_minus'] = False
+        return True
+    except:
+        # 如果所有方法都失败，使用英文标签
+        return False
+
+def render_emoji_timeline_chart(course_id, hourly_rows, dpi):
+    """
+    绘制24小时情绪变化曲线图，返回 PNG 字节
+    """
+    plt.figure(figsize=(12, 6))
+    
+    if not hourly_rows:
+        # 如果没有数据，显示提示信息
+        plt.text(0.5, 0.5, '暂无24小时内的表情数据', 
+                 horizontalalignment='center', 
+                 verticalalignment='center', 
+                 transform=plt.gca().transAxes, 
+                 fontsize=12)
+        plt.title(f'课程 {course_id} - 24小时情绪变化趋势', fontsize=14, fontweight='bold')
+        plt.xlabel('时间 (小时)', fontsize=12)
+        plt.ylabel('表情发送数量', fontsize=12)
+        plt.grid(True, alpha=0.3)
+    else:
+        # 固定表情类型范围为1到10，无论是否出现都要绘制
+        emoji_types = list(range(1, 11))
+        # 只绘制有数据的整点
+        actual_hours = sorted({hour for hour, _, _ in hourly_rows})
+        hour_index = {hour: i for i, hour in enumerate(actual_hours)}
+
+        # 用一次 np.add.at 把 (整点, 类型, 数量) 散列成 类型 × 整点 的矩阵，缺失的格子为 0
+        rows = np.array([(t - 1, hour_index[hour], n) for hour, t, n in hourly_rows if 1 <= t <= 10],
+                        dtype=np.int64).reshape(-1, 3)
+        matrix = np.zeros((len(emoji_types), len(actual_hours)), dtype=np.int64)
+        np.add.at(matrix, (rows[:, 0], rows[:, 1]), rows[:, 2])
+
+        # 为每种表情类型绘制曲线
+        colors = plt.cm.tab20.colors  # 使用更多颜色
+        hours_labels = [f"{h.hour:02d}:00" for h in actual_hours]
+        
+        # 所有数据中的最大值，用于设置合理的Y轴上限
+        max_count = int(matrix.max()) if matrix.size else 0
+        for i, emoji_type in enumerate(emoji_types):
+            # 使用索引获取颜色，如果表情类型过多则循环使用
+            color = colors[i % len(colors)]
+            emoji_name = EMOJI_TYPE_MAP.get(int(emoji_type), f'表情 {emoji_type}')
+            plt.plot(hours_labels, matrix[i], marker='o', label=emoji_name, linewidth=2, color=color)
+        
+        plt.title(f'课程 {course_id} - 24小时情绪变化趋势', fontsize=14, fontweight='bold')
+        plt.xlabel('时间 (小时)', fontsize=12)
+        plt.ylabel('表情发送数量', fontsize=12)
+        
+        # 优化图例，如果表情类型过多则限制显示
+        if len(emoji_types) > 10:
+            plt.legend(title='表情类型（部分显示）', loc='best', ncol=2)
+        else:
+            plt.legend(title='表情类型', loc='best')
+        
+        plt.grid(True, alpha=0.3)
+        plt.xticks(rotation=45)
+        # Y轴从0开始，更合理地显示数量数据
+        plt.ylim(bottom=0)
+
+        ax = plt.gca()
+        ax.yaxis.set_major_locator(MaxNLocator(integer=True))
+        # 如果有数据，设置合适的Y轴上限，确保整数刻度显示
+        if max_count > 0:
+            # 设置Y轴上限为最大值加1，确保所有数据点都能显示
+            plt.ylim(top=max_count + 1)
+            # 确保Y轴刻度为整数
+            plt.yticks(range(0, max_count + 2))
+
+    plt.tight_layout()
+    return save_figure(dpi)
+
+def save_figure(dpi):
+    """把当前图表保存为 PNG 字节并释放 matplotlib 资源"""
+    img_buffer = io.BytesIO()
+    plt.savefig(img_buffer, format='png', dpi=dpi, bbox_inches='tight')
+    plt.close()
+    return img_buffer.getvalue()
+
+def render_emoji_bar_chart(course_id, start_time, end_time, emoji_labels, counts, dpi):
+    """
+    绘制表情数量统计柱状图，返回 PNG 字节
+    """
+    # 开始绘图
+    plt.figure(figsize=(10, 6))
+
+    bars = plt.bar(emoji_labels, counts, color=plt.cm.Set3(range(len(emoji_labels))))
+
+    # 显示柱状图文字
+    for bar, count in zip(bars, counts):
+        plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.05,
+                 str(count), ha='center', va='bottom', fontsize=10)
+
+    # 图表样式
+    plt.title(
+        f'课程 {course_id} - 表情数量统计\n({start_time.strftime("%Y-%m-%d")} 至 {end_time.strftime("%Y-%m-%d")})', 
+        fontsize=14, fontweight='bold', pad=20
+    )
+    plt.xlabel('表情类型', fontsize=12)
+    plt.ylabel('发送数量', fontsize=12)
+    plt.xticks(rotation=45, ha='right')
+    plt.grid(True, alpha=0.3, axis='y')
+    plt.tight_layout()
+    return save_figure(dpi)
+
+def render_emoji_pie_chart(course_id, start_time, end_time, names, counts, dpi):
+    """
+    绘制表情分布饼图（counts 已把 0 排在最后），返回 PNG 字节
+    """
+    total = sum(counts)
+    # 饼图不能全0，因此给极小值防崩溃
+    display_counts = [c if c > 0 else 0.01 for c in counts]
+
+    plt.figure(figsize=(14, 8))
+    #colors = plt.cm.Set3(range(len(names)))
+    colors = plt.cm.Paired(range(len(names)))
+
+    wedges = plt.pie(
+        display_counts,
+        labels=None,
+        startangle=90,
+        colors=colors,
+        shadow=False,
+        wedgeprops={"linewidth": 1, "edgecolor": "white"}
+    )[0]
+
+    ax = plt.gca()
+    ax.axis("equal")
+    zero_items = []  # 先收集所有 count == 0 的
+    for wedge, name, count in zip(wedges, names, counts):
+        if count == 0:
+            zero_items.append((wedge, name))
+            continue
+
+        # -------- 正常绘制 >0 的 --------
+        ang = (wedge.theta2 + wedge.theta1) / 2
+        x = np.cos(np.radians(ang))
+        y = np.sin(np.radians(ang))
+        percent = count / total * 100
+        label = f"{name}: {count} 次 ({percent:.1f}%)"
+
+        line_x = 1.05 * x
+        line_y = 1.05 * y
+        horiz_x = 1.3 if x > 0 else -1.3
+        ha = "left" if x > 0 else "right"
+
+        ax.plot([x*1.0, line_x, horiz_x], [y*1.0, line_y, line_y], color="black", linewidth=0.8)
+        ax.text(horiz_x, line_y, label, ha=ha, va="center", fontsize=13)
+
+    # -------- 合并处理所有 count = 0 --------
+    if zero_items:
+        # 取第一个 0 的 wedge 定位置
+        wedge = zero_items[0][0]
+        ang = (wedge.theta2 + wedge.theta1) / 2
+        x = np.cos(np.radians(ang))
+        y = np.sin(np.radians(ang))
+        if len(zero_items) > 1:
+            label_zero = f"其余: 0 次 (0.0%)"
+        else:
+            label_zero = f"{zero_items[0][1]}: 0 次 (0.0%)"
+        # 两段折线
+        line_x = 1.05 * x
+        line_y = 1.05 * y
+        horiz_x = 1.3 if x > 0 else -1.3
+        ha = "left" if x > 0 else "right"
+
+        ax.plot([x*1.0, line_x, horiz_x], [y*1.0, line_y, line_y], color="black", linewidth=0.8)
+        ax.text(horiz_x, line_y, label_zero, ha=ha, va="center", fontsize=13)
+
+    # -------- 图例：只写名称 + 显示所有类型 --------
+    plt.legend(
+        wedges, 
+        names,
+        title="表情类型",
+        loc="lower right",
+        bbox_to_anchor=(1, 0),
+        fontsize=13
+    )
+
+    plt.title(
+        f'课程 {course_id} - 表情分布饼图\n({start_time.strftime("%Y-%m-%d")} 至 {end_time.strftime("%Y-%m-%d")})',
+        fontsize=14, fontweight='bold', pad=20
+    )
+    plt.tight_layout()
+    return save_figure(dpi)
+
+
+RENDERERS = {
+    'timeline': render_emoji_timeline_chart,
+    'bar': render_emoji_bar_chart,
+    'pie': render_emoji_pie_chart,
+}
+
+_font_ready = False
+
+
+def init_worker():
+    """渲染进程初始化：只加载一次中文字体"""
+    global _font_ready
+    if not _font_ready:
+        setup_chinese_font()
+        _font_ready = True
+
+
+def render(kind, params):
+    """按图表类型调用对应的绘图函数，返回 PNG 字节"""
+    init_worker()
+    return RENDERERS[kind](**params)
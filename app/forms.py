@@ -119,7 +119,7 @@ class StudentCourseForm(FlaskForm):
 class EmojiForm(FlaskForm):
     emoji_id = StringField('表情ID', validators=[
         DataRequired(message='表情ID不能为空'),
-        Length(min=1, max=10, message='表情ID长度必须在1-10个字符之间')
+        Length(min=1, max=20, message='表情ID长度必须在1-20个字符之间')
     ])
     
     student_id = StringField('学生ID', validators=[
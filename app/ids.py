@@ -0,0 +1,92 @@
+# app/ids.py
+"""
+按时间有序的紧凑 ID（ULID 思路的 20 位变体）
+
+100 位 = 48 位毫秒时间戳 + 52 位随机/序号，编码为 20 个 Crockford Base32 字符。
+- 字典序与生成时间一致，新行总是追加到主键索引末尾
+- 同一毫秒内在随机起点上递增，保证单进程内严格单调
+- 不同进程各自取随机起点，同一毫秒撞号的概率可以忽略
+"""
+import os
+import secrets
+import threading
+import time
+from datetime import datetime
+
+ID_LENGTH = 20
+
+_ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'  # Crockford Base32，无 I L O U
+_DECODE = {c: i for i, c in enumerate(_ALPHABET)}
+_RANDOM_BITS = 52
+_RANDOM_MASK = (1 << _RANDOM_BITS) - 1
+
+_lock = threading.Lock()
+_pid = None
+_last_ms = 0
+_last_random = 0
+
+
+def _encode(value):
+    chars = []
+    for _ in range(ID_LENGTH):
+        chars.append(_ALPHABET[value & 31])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+
+def _to_ms(value):
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    return int(value)
+
+
+def new_emoji_id():
+    """生成一个新的、单调递增的 Emoji ID"""
+    global _pid, _last_ms, _last_random
+
+    with _lock:
+        # fork 出的子进程会继承父进程的状态，必须重新取随机起点
+        if _pid != os.getpid():
+            _pid = os.getpid()
+            _last_ms = 0
+
+        now_ms = int(time.time() * 1000)
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            # 最高位留空，给同一毫秒内的递增留出空间
+            _last_random = secrets.randbits(_RANDOM_BITS - 1)
+        else:
+            # 同一毫秒（或时钟回拨）：沿用上一个时间戳，序号加一
+            _last_random += 1
+            if _last_random > _RANDOM_MASK:
+                _last_ms += 1
+                _last_random = secrets.randbits(_RANDOM_BITS - 1)
+
+        return _encode((_last_ms << _RANDOM_BITS) | _last_random)
+
+
+def id_for_time(value, random_part=None):
+    """为给定时间生成 ID（用于迁移历史数据），random_part 缺省为随机数"""
+    if random_part is None:
+        random_part = secrets.randbits(_RANDOM_BITS - 1)
+    return _encode((_to_ms(value) << _RANDOM_BITS) | (random_part & _RANDOM_MASK))
+
+
+def id_floor(value):
+    """给定时间（datetime 或毫秒时间戳）对应的最小 ID，可用于主键范围查询"""
+    return _encode(_to_ms(value) << _RANDOM_BITS)
+
+
+def id_time(emoji_id):
+    """从 ID 中取出生成时间；不是本方案生成的旧 ID，或时间戳超出可表示范围时返回 None"""
+    if len(emoji_id) != ID_LENGTH:
+        return None
+    value = 0
+    for c in emoji_id:
+        if c not in _DECODE:
+            return None
+        value = (value << 5) | _DECODE[c]
+    try:
+        return datetime.fromtimestamp((value >> _RANDOM_BITS) / 1000)
+    except (ValueError, OverflowError, OSError):
+        return None
@@ -0,0 +1,161 @@
+# app/live_counters.py
+"""
+最近 24 小时的表情计数环（进程内）
+
+每个课程一个 24 小时 × 10 类型的计数环，表情写库后增量更新，
+时间前进时自动覆盖过期的小时槽。24 小时情绪变化图只读这里，不再查询数据库。
+
+第一次使用时从小时汇总表加载；之后每隔 LIVE_COUNTERS_RESYNC_SECONDS 秒重新加载一次，
+用来纳入其它工作进程写入的数据，并修正撤回、删除等操作造成的偏差。
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+HOURS = 24
+EMOJI_TYPES = range(1, 11)
+
+
+def _hour_key(value):
+    """把时间映射为整数小时编号，便于取模定位槽位"""
+    return value.toordinal() * 24 + value.hour
+
+
+def _key_to_hour(key):
+    return datetime.fromordinal(key // 24) + timedelta(hours=key % 24)
+
+
+def _get(row, key):
+    return row[key] if isinstance(row, dict) else getattr(row, key)
+
+
+class HourlyRing:
+    """单个课程的 24 × 10 计数环"""
+
+    def __init__(self):
+        self.keys = [None] * HOURS
+        self.counts = [[0] * len(EMOJI_TYPES) for _ in range(HOURS)]
+
+    def add(self, key, emoji_type, n):
+        slot = key % HOURS
+        if self.keys[slot] != key:
+            # 槽位里是 24 小时之前的数据，清零后复用
+            self.keys[slot] = key
+            self.counts[slot] = [0] * len(EMOJI_TYPES)
+        self.counts[slot][emoji_type - 1] += n
+
+    def rows(self, now_key):
+        """返回 [(整点, 类型, 数量), ...]，按时间升序，只包含数量大于 0 的项"""
+        result = []
+        for key in range(now_key - HOURS + 1, now_key + 1):
+            slot = key % HOURS
+            if self.keys[slot] != key:
+                continue
+            hour = _key_to_hour(key)
+            for i, n in enumerate(self.counts[slot]):
+                if n > 0:
+                    result.append((hour, i + 1, n))
+        return result
+
+
+class LiveCounters:
+    def __init__(self, app=None, db=None):
+        self.db = None
+        self._rings = {}
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        app.config.setdefault('LIVE_COUNTERS_RESYNC_SECONDS', 60)
+        self.db = db
+        self.resync_seconds = app.config['LIVE_COUNTERS_RESYNC_SECONDS']
+        app.extensions['live_counters'] = self
+
+    def record(self, rows, sign=1):
+        """按一批表情（字典或模型对象）更新计数，sign=-1 表示撤回"""
+        now_key = _hour_key(datetime.now())
+        with self._lock:
+            if self._loaded_at is None:
+                # 尚未加载，首次读取时会从数据库完整加载
+                return
+            for row in rows:
+                emoji_type = _get(row, 'type')
+                emoji_time = _get(row, 'time')
+                if emoji_time is None:
+                    # time 为空的旧数据不在汇总表中，也不计入计数环
+                    continue
+                key = _hour_key(emoji_time)
+                if emoji_type not in EMOJI_TYPES or not now_key - HOURS < key <= now_key:
+                    continue
+                course_id = _get(row, 'course_id')
+                ring = self._rings.get(course_id)
+                if ring is None:
+                    ring = self._rings[course_id] = HourlyRing()
+                ring.add(key, emoji_type, sign)
+
+    def invalidate(self):
+        """下次读取时重新从数据库加载（删除学生、课程之后调用）"""
+        with self._lock:
+            self._loaded_at = None
+
+    def hourly_counts(self, course_id):
+        """
+        返回课程最近 24 小时（当前小时及之前 23 个小时）的 [(整点, 类型, 数量), ...]
+        格式与 rollup.hourly_counts 一致
+        """
+        self._ensure_loaded()
+        now_key = _hour_key(datetime.now())
+        with self._lock:
+            ring = self._rings.get(course_id)
+            return ring.rows(now_key) if ring is not None else []
+
+    def hourly_totals(self):
+        """
+        返回 {课程: [24 个整点的表情总数]}，从 23 个小时之前到当前小时，只包含最近 24 小时有表情的课程
+        所有课程的计数环由同一次查询加载
+        """
+        self._ensure_loaded()
+        now_key = _hour_key(datetime.now())
+        keys = range(now_key - HOURS + 1, now_key + 1)
+        with self._lock:
+            totals = {}
+            for course_id, ring in self._rings.items():
+                row = [sum(ring.counts[key % HOURS]) if ring.keys[key % HOURS] == key else 0 for key in keys]
+                if any(row):
+                    totals[course_id] = row
+            return totals
+
+    def _ensure_loaded(self):
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < self.resync_seconds:
+            return
+        self._load()
+
+    def _load(self):
+        # 一次查询加载所有课程最近 24 小时的小时桶
+        from app.models import EmojiHourlyCount
+
+        now_key = _hour_key(datetime.now())
+        since = _key_to_hour(now_key - HOURS + 1)
+        rows = self.db.session.query(
+            EmojiHourlyCount.course_id,
+            EmojiHourlyCount.bucket,
+            EmojiHourlyCount.type,
+            EmojiHourlyCount.count
+        ).filter(
+            EmojiHourlyCount.bucket >= since,
+            EmojiHourlyCount.type.between(1, 10)
+        ).all()
+
+        rings = {}
+        for course_id, bucket, emoji_type, n in rows:
+            ring = rings.get(course_id)
+            if ring is None:
+                ring = rings[course_id] = HourlyRing()
+            ring.add(_hour_key(bucket), emoji_type, n)
+
+        with self._lock:
+            self._rings = rings
+            self._loaded_at = time.monotonic()
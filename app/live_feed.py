@@ -0,0 +1,147 @@
+# app/live_feed.py
+"""
+课堂表情实时推送（进程内发布/订阅）
+
+表情写库提交后（写缓冲的 after_commit 钩子、撤回接口）按课程发布一条消息，
+教师端的 SSE 连接各自订阅一个课程，只收到新发生的表情和按类型汇总的增量，
+不需要反复刷新页面重新查询整个课程的历史。
+
+每个订阅者一个有界队列：消费太慢导致队列写满时不再阻塞发布方，
+而是给该订阅者打上 overflowed 标记，由 SSE 连接通知浏览器重新加载。
+订阅只覆盖本进程写入的表情；其它工作进程和 ingest 节点写入的表情由 SSE 连接
+每隔 LIVE_FEED_CATCHUP_SECONDS 秒按 id 从数据库补齐（与断线重连按 Last-Event-ID 补发是同一个查询）。
+"""
+import json
+import queue
+import threading
+from collections import Counter, defaultdict
+
+EMOJI_TYPES = range(1, 11)
+
+
+def _get(row, key):
+    return row[key] if isinstance(row, dict) else getattr(row, key)
+
+
+def emoji_payload(rows):
+    """把同一课程的一批表情转成推送给浏览器的数据"""
+    emojis = []
+    deltas = Counter()
+    for row in rows:
+        emoji_type = _get(row, 'type')
+        emojis.append({
+            'id': _get(row, 'id'),
+            'type': emoji_type,
+            # time 为空的旧数据（撤回时也会发布）
+            'time': _format_time(_get(row, 'time'))
+        })
+        deltas[emoji_type] += 1
+    return emojis, deltas
+
+
+def _format_time(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S') if value is not None else None
+
+
+class Subscription:
+    def __init__(self, course_id, maxsize):
+        self.course_id = course_id
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def offer(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout):
+        """取下一条消息，超时返回 None"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class LiveFeed:
+    def __init__(self, app=None):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+        self.queue_size = 256
+        self.heartbeat = 15
+        self.backfill_limit = 500
+        self.catchup = 5
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('LIVE_FEED_QUEUE_SIZE', 256)
+        app.config.setdefault('LIVE_FEED_HEARTBEAT_SECONDS', 15)
+        app.config.setdefault('LIVE_FEED_BACKFILL_LIMIT', 500)
+        app.config.setdefault('LIVE_FEED_CATCHUP_SECONDS', 5)
+        self.queue_size = app.config['LIVE_FEED_QUEUE_SIZE']
+        self.heartbeat = app.config['LIVE_FEED_HEARTBEAT_SECONDS']
+        self.backfill_limit = app.config['LIVE_FEED_BACKFILL_LIMIT']
+        self.catchup = app.config['LIVE_FEED_CATCHUP_SECONDS']
+        app.extensions['live_feed'] = self
+
+    def subscribe(self, course_id):
+        subscription = Subscription(course_id, self.queue_size)
+        with self._lock:
+            self._subscribers[course_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.course_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.course_id]
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(s) for s in self._subscribers.values())
+
+    def publish(self, rows, sign=1):
+        """
+        发布一批已提交的表情（字典或模型对象），sign=-1 表示撤回
+        在写缓冲的后台线程中调用，不能阻塞
+        """
+        with self._lock:
+            if not self._subscribers:
+                return
+            watched = set(self._subscribers)
+
+        by_course = defaultdict(list)
+        for row in rows:
+            course_id = _get(row, 'course_id')
+            if course_id in watched and _get(row, 'type') in EMOJI_TYPES:
+                by_course[course_id].append(row)
+
+        for course_id, course_rows in by_course.items():
+            emojis, deltas = emoji_payload(course_rows)
+            if sign > 0:
+                message = ('emoji', max(e['id'] for e in emojis), {
+                    'emojis': emojis,
+                    'deltas': {str(t): n for t, n in deltas.items()}
+                })
+            else:
+                message = ('retract', None, {
+                    'ids': [e['id'] for e in emojis],
+                    'deltas': {str(t): -n for t, n in deltas.items()}
+                })
+            with self._lock:
+                subscribers = list(self._subscribers.get(course_id, ()))
+            for subscription in subscribers:
+                subscription.offer(message)
+
+
+def format_sse(event, data, event_id=None):
+    """按 text/event-stream 格式编码一条消息"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append('data: ' + json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+    return '\n'.join(lines) + '\n\n'
@@ -0,0 +1,194 @@
+# app/metrics.py
+"""
+请求级性能指标
+
+- Flask 请求钩子记录每个端点的耗时直方图和请求数
+- SQLAlchemy 的 before_cursor_execute / after_cursor_execute 事件统计每个请求执行的 SQL 条数和数据库耗时
+- 图表渲染耗时由 ChartRenderer 的 after_render 钩子上报
+
+/admin/metrics 以 Prometheus 文本格式输出。请求内的计数放在线程局部变量里，
+每条 SQL 只做一次计时和加法；每个请求结束时加一次锁合并到全局统计。
+流式响应（SSE、CSV 导出）只统计到响应开始发送为止。
+"""
+import bisect
+import threading
+import time
+
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# 直方图的桶上界（秒）
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 不在请求内执行的 SQL（写缓冲后台线程、命令行）记在这个端点名下
+BACKGROUND = '-background'
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class EndpointStats:
+    def __init__(self):
+        self.duration = Histogram()
+        self.statuses = {}
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+class Metrics:
+    def __init__(self, app=None):
+        self._endpoints = {}
+        self._charts = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._values = []
+        self.enabled = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('METRICS_ENABLED', True)
+        app.config.setdefault('METRICS_TOKEN', None)
+        self.enabled = app.config['METRICS_ENABLED']
+        app.extensions['metrics'] = self
+        if not self.enabled:
+            return
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        # 监听所有 Engine，不需要在应用上下文中取得 db.engine；重复 init_app 时不重复监听
+        if not event.contains(Engine, 'before_cursor_execute', self._before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def register_value(self, name, help_text, fn, metric_type='gauge'):
+        """注册一个在输出时才取值的指标，fn() 返回数值"""
+        self._values.append((name, help_text, fn, metric_type))
+
+    def observe_chart_render(self, kind, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._charts.get(kind)
+            if histogram is None:
+                histogram = self._charts[kind] = Histogram()
+            histogram.observe(seconds)
+
+    # ---------------- 请求钩子 ----------------
+
+    def _before_request(self):
+        g.metrics_start = time.perf_counter()
+        # [SQL 条数, 数据库耗时]
+        self._local.stats = [0, 0.0]
+
+    def _after_request(self, response):
+        g.metrics_status = response.status_code
+        return response
+
+    def _teardown_request(self, exc):
+        start = g.pop('metrics_start', None)
+        stats = getattr(self._local, 'stats', None)
+        self._local.stats = None
+        if start is None or stats is None:
+            return
+        elapsed = time.perf_counter() - start
+        status = g.pop('metrics_status', 500 if exc is not None else 200)
+        endpoint = request.endpoint or '-unmatched'
+        self._record(endpoint, status, elapsed, stats[0], stats[1])
+
+    def _record(self, endpoint, status, elapsed, queries, db_seconds):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = EndpointStats()
+            if status is not None:
+                stats.duration.observe(elapsed)
+                stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.queries += queries
+            stats.db_seconds += db_seconds
+
+    # ---------------- SQL 事件 ----------------
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('metrics_query_start')
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        stats = getattr(self._local, 'stats', None)
+        if stats is not None:
+            stats[0] += 1
+            stats[1] += elapsed
+        else:
+            self._record(BACKGROUND, None, 0.0, 1, elapsed)
+
+    # ---------------- 输出 ----------------
+
+    def render(self):
+        """按 Prometheus 文本格式输出全部指标"""
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            charts = sorted(self._charts.items())
+            lines = []
+
+            lines.append('# HELP selab_http_requests_total 各端点的请求数')
+            lines.append('# TYPE selab_http_requests_total counter')
+            for endpoint, stats in endpoints:
+                for status, n in sorted(stats.statuses.items()):
+                    lines.append(f'selab_http_requests_total{{endpoint="{endpoint}",status="{status}"}} {n}')
+
+            lines.append('# HELP selab_http_request_duration_seconds 各端点的请求耗时')
+            lines.append('# TYPE selab_http_request_duration_seconds histogram')
+            for endpoint, stats in endpoints:
+                if stats.duration.count:
+                    _histogram_lines(lines, 'selab_http_request_duration_seconds',
+                                     f'endpoint="{endpoint}"', stats.duration)
+
+            lines.append('# HELP selab_db_queries_total 各端点执行的 SQL 条数')
+            lines.append('# TYPE selab_db_queries_total counter')
+            for endpoint, stats in endpoints:
+                lines.append(f'selab_db_queries_total{{endpoint="{endpoint}"}} {stats.queries}')
+
+            lines.append('# HELP selab_db_seconds_total 各端点执行 SQL 的总耗时')
+            lines.append('# TYPE selab_db_seconds_total counter')
+            for endpoint, stats in endpoints:
+                lines.append(f'selab_db_seconds_total{{endpoint="{endpoint}"}} {stats.db_seconds:.6f}')
+
+            lines.append('# HELP selab_chart_render_seconds 图表渲染耗时（不含缓存命中）')
+            lines.append('# TYPE selab_chart_render_seconds histogram')
+            for kind, histogram in charts:
+                _histogram_lines(lines, 'selab_chart_render_seconds', f'kind="{kind}"', histogram)
+
+        for name, help_text, fn, metric_type in self._values:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            lines.append(f'{name} {fn()}')
+
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+            self._charts.clear()
+
+
+def _histogram_lines(lines, name, labels, histogram):
+    cumulative = 0
+    for bound, n in zip(BUCKETS, histogram.counts):
+        cumulative += n
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f'{name}_sum{{{labels}}} {histogram.sum:.6f}')
+    lines.append(f'{name}_count{{{labels}}} {histogram.count}')
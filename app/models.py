@@ -3,6 +3,7 @@ from app import db
 from sqlalchemy.orm import validates
 from sqlalchemy import CheckConstraint
 from datetime import datetime
+from app.ids import new_emoji_id
 
 class User(db.Model):
     id = db.Column('User_ID', db.String(20), primary_key=True)
@@ -51,6 +52,9 @@ class Course(db.Model):
     teacher = db.relationship('User', back_populates='teacher_courses')
     student_courses = db.relationship('Student_Course', back_populates='course', cascade='all, delete-orphan')
     emojis = db.relationship('Emoji', back_populates='course', cascade='all, delete-orphan')
+    hourly_counts = db.relationship('EmojiHourlyCount', cascade='all, delete-orphan')
+    minute_counts = db.relationship('EmojiMinuteCount', cascade='all, delete-orphan')
+    daily_counts = db.relationship('EmojiDailyCount', cascade='all, delete-orphan')
 
 class Student_Course(db.Model):
     student_id = db.Column('Student_ID', db.String(20), db.ForeignKey('user.User_ID'), primary_key=True)
@@ -60,7 +64,8 @@ class Student_Course(db.Model):
     course = db.relationship('Course', back_populates='student_courses')
 
 class Emoji(db.Model):
-    id = db.Column('Emoji_ID', db.String(10), primary_key=True)
+    # 按时间有序的 ID（见 app/ids.py），新行追加在主键索引末尾
+    id = db.Column('Emoji_ID', db.String(20), primary_key=True, default=new_emoji_id)
     student_id = db.Column('Student_ID', db.String(20), db.ForeignKey('user.User_ID'))
     course_id = db.Column('Course_ID', db.String(20), db.ForeignKey('course.Course_ID'))
     time = db.Column('time', db.DateTime)
@@ -72,6 +77,10 @@ class Emoji(db.Model):
     
     __table_args__ = (
         CheckConstraint('type >= 1', name='check_emoji_type_positive'),
+        # 课程 + 时间范围（+ 类型）：统计图表、课程历史、CSV 导出、汇总表重建
+        db.Index('ix_emoji_course_time_type', 'Course_ID', 'time', 'type'),
+        # 学生历史记录：按学生过滤并按时间倒序
+        db.Index('ix_emoji_student_time', 'Student_ID', 'time'),
     )
     
     @validates('type')
@@ -84,4 +93,24 @@ class Emoji(db.Model):
     def validate_time(self, key, time_val):
         if time_val and time_val > datetime.now():
             raise ValueError("Emoji时间不能是未来的时间")
-        return time_val
\ No newline at end of file
+        return time_val
+
+# Emoji 小时汇总表：按 (课程, 整点, 类型) 计数，由 app/rollup.py 增量维护
+class EmojiHourlyCount(db.Model):
+    course_id = db.Column('Course_ID', db.String(20), db.ForeignKey('course.Course_ID'), primary_key=True)
+    bucket = db.Column('bucket', db.DateTime, primary_key=True)  # 小时起点，如 2025-12-01 09:00:00
+    type = db.Column('type', db.Integer, primary_key=True)
+    count = db.Column('count', db.Integer, nullable=False, default=0)
+
+# 分钟、天汇总表：结构与小时汇总表相同，供可缩放的时间线按范围选用（见 app/timeline.py）
+class EmojiMinuteCount(db.Model):
+    course_id = db.Column('Course_ID', db.String(20), db.ForeignKey('course.Course_ID'), primary_key=True)
+    bucket = db.Column('bucket', db.DateTime, primary_key=True)  # 分钟起点，如 2025-12-01 09:05:00
+    type = db.Column('type', db.Integer, primary_key=True)
+    count = db.Column('count', db.Integer, nullable=False, default=0)
+
+class EmojiDailyCount(db.Model):
+    course_id = db.Column('Course_ID', db.String(20), db.ForeignKey('course.Course_ID'), primary_key=True)
+    bucket = db.Column('bucket', db.DateTime, primary_key=True)  # 当天零点，如 2025-12-01 00:00:00
+    type = db.Column('type', db.Integer, primary_key=True)
+    count = db.Column('count', db.Integer, nullable=False, default=0)
@@ -0,0 +1,54 @@
+# app/pagination.py
+"""
+管理员列表的游标（keyset）分页
+
+按主键排序，用 "主键 > 上一页最后一条" 代替 OFFSET：
+每页只读取 per_page + 1 行，翻到第几页耗时都一样，也不会一次把整张表读进内存。
+游标就是主键值本身，可以和搜索条件等其它过滤条件自由组合。
+"""
+from collections import namedtuple
+
+from flask import current_app, request
+
+KeysetPage = namedtuple('KeysetPage', ['items', 'per_page', 'next_cursor', 'prev_cursor'])
+
+
+def keyset_paginate(query, column, after=None, before=None, per_page=50):
+    """
+    对 query 按 column（唯一且有索引的列，通常是主键）分页
+
+    after:  返回 column > after 的下一页
+    before: 返回 column < before 的上一页
+    两者都不传时返回第一页
+    """
+    if before is not None:
+        # 倒序取 before 之前的 per_page + 1 行，再翻转回升序
+        rows = query.filter(column < before).order_by(column.desc()).limit(per_page + 1).all()
+        has_more = len(rows) > per_page
+        items = list(reversed(rows[:per_page]))
+        prev_cursor = _key(items[0], column) if has_more and items else None
+        next_cursor = _key(items[-1], column) if items else None
+    else:
+        if after is not None:
+            query = query.filter(column > after)
+        rows = query.order_by(column).limit(per_page + 1).all()
+        has_more = len(rows) > per_page
+        items = rows[:per_page]
+        next_cursor = _key(items[-1], column) if has_more else None
+        prev_cursor = _key(items[0], column) if after is not None and items else None
+    return KeysetPage(items, per_page, next_cursor, prev_cursor)
+
+
+def paginate_request(query, column):
+    """从请求参数 after / before / per_page 读取游标并分页"""
+    default = current_app.config.get('ADMIN_PAGE_SIZE', 50)
+    limit = current_app.config.get('ADMIN_PAGE_SIZE_MAX', 200)
+    per_page = request.args.get('per_page', default, type=int)
+    per_page = max(1, min(per_page, limit))
+    after = request.args.get('after') or None
+    before = request.args.get('before') or None
+    return keyset_paginate(query, column, after=after, before=before, per_page=per_page)
+
+
+def _key(item, column):
+    return getattr(item, column.key)
@@ -0,0 +1,135 @@
+# app/purge.py
+"""
+分批删除教师、学生、课程及其全部下级数据
+
+模型关系上的 cascade='all, delete-orphan' 会让 session.delete() 先把所有 Emoji、选课记录读进内存，
+再一条一条删除，课程历史一大就会把工作进程的内存耗尽。
+这里改为按 PURGE_CHUNK_SIZE 分批：每批只取出一批主键，用一条 DELETE ... IN 删除并提交，
+内存占用与下级数据的总量无关；最后用一条 DELETE 删除上级记录本身。
+
+每批单独提交，中途失败时已删除的部分不会恢复，但上级记录仍在，重新执行即可继续删除；
+失败时回滚当前批次、通知缓存重新加载，并抛出 PurgeError 说明删除到一半。
+删除学生表情时同一事务内扣减分钟、小时、天汇总表，汇总表始终与剩余数据一致。
+progress(表名, 累计删除行数) 在每批提交后调用，用于显示进度。
+"""
+import logging
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import current_app
+from sqlalchemy import delete, select
+
+from app import db, live_counters, search_index
+from app import dashboard
+from app import rollup
+from app.models import User, Course, Student_Course, Emoji, EmojiMinuteCount, EmojiHourlyCount, EmojiDailyCount
+
+logger = logging.getLogger(__name__)
+
+
+class PurgeError(Exception):
+    """分批删除中途失败，已提交的批次不会恢复"""
+
+
+def purge_course(course_id, progress=None):
+    """删除课程及其表情、选课记录和汇总数据，返回 {表名: 删除行数}"""
+    with _reporting('课程', course_id):
+        return _purge_course(course_id, progress)
+
+
+def purge_student(student_id, progress=None):
+    """删除学生及其表情（同时扣减汇总表）、选课记录，返回 {表名: 删除行数}"""
+    with _reporting('学生', student_id):
+        deleted = _purge_user_rows(student_id, progress)
+        deleted['user'] += db.session.execute(delete(User).where(User.id == student_id)).rowcount
+        db.session.commit()
+        _after_purge()
+        return deleted
+
+
+def purge_teacher(teacher_id, progress=None):
+    """删除教师及其开设的全部课程，返回 {表名: 删除行数}"""
+    with _reporting('教师', teacher_id):
+        deleted = Counter()
+        course_ids = [cid for (cid,) in db.session.query(Course.id).filter(Course.teacher_id == teacher_id)]
+        for course_id in course_ids:
+            deleted.update(_purge_course(course_id, progress))
+        deleted.update(_purge_user_rows(teacher_id, progress))
+        deleted['user'] += db.session.execute(delete(User).where(User.id == teacher_id)).rowcount
+        db.session.commit()
+        _after_purge()
+        return deleted
+
+
+@contextmanager
+def _reporting(label, object_id):
+    try:
+        yield
+    except Exception as e:
+        db.session.rollback()
+        # 之前的批次已经提交，进程内的缓存同样需要重新加载
+        _after_purge()
+        logger.exception('删除%s %s 中途失败', label, object_id)
+        raise PurgeError(f'删除{label} {object_id} 中途失败，已删除的部分不会恢复，重新执行即可继续删除：{e}') from e
+
+
+def _purge_course(course_id, progress):
+    deleted = Counter()
+    deleted['emoji'] += _delete_in_chunks(
+        Emoji, Emoji.id, Emoji.course_id == course_id, progress)
+    deleted['student__course'] += _delete_in_chunks(
+        Student_Course, Student_Course.student_id, Student_Course.course_id == course_id, progress)
+
+    session = db.session
+    for model in (EmojiMinuteCount, EmojiHourlyCount, EmojiDailyCount):
+        deleted[model.__tablename__] += session.execute(
+            delete(model).where(model.course_id == course_id)).rowcount
+    deleted['course'] += session.execute(delete(Course).where(Course.id == course_id)).rowcount
+    session.commit()
+    _after_purge()
+    return deleted
+
+
+def _purge_user_rows(user_id, progress):
+    deleted = Counter()
+    deleted['emoji'] += _delete_in_chunks(
+        Emoji, Emoji.id, Emoji.student_id == user_id, progress,
+        extra_columns=(Emoji.course_id, Emoji.time, Emoji.type),
+        # time 为空的旧数据不在汇总表中，扣减时跳过
+        before_delete=lambda rows: rollup.record(db.session, [row for row in rows if row.time is not None], sign=-1))
+    deleted['student__course'] += _delete_in_chunks(
+        Student_Course, Student_Course.course_id, Student_Course.student_id == user_id, progress)
+    return deleted
+
+
+def _delete_in_chunks(model, key, condition, progress, extra_columns=(), before_delete=None):
+    """
+    分批删除 model 中满足 condition 的行：每批取出 PURGE_CHUNK_SIZE 个 key，
+    DELETE ... WHERE condition AND key IN (...) 后提交。返回删除的总行数
+    """
+    chunk_size = current_app.config['PURGE_CHUNK_SIZE']
+    session = db.session
+    table = model.__tablename__
+    total = 0
+    while True:
+        rows = session.execute(select(key, *extra_columns).where(condition).limit(chunk_size)).all()
+        if not rows:
+            break
+        if before_delete is not None:
+            before_delete(rows)
+        keys = [row[0] for row in rows]
+        total += session.execute(delete(model).where(condition, key.in_(keys))).rowcount
+        session.commit()
+        logger.info('%s: 已删除 %d 行', table, total)
+        if progress is not None:
+            progress(table, total)
+        if len(rows) < chunk_size:
+            break
+    return total
+
+
+def _after_purge():
+    # 批量 DELETE 不经过 ORM 事件，通知进程内的缓存重新加载
+    live_counters.invalidate()
+    search_index.invalidate()
+    dashboard.invalidate()
@@ -0,0 +1,289 @@
+# app/rollup.py
+"""
+Emoji 汇总表的维护与查询
+
+汇总表有三种粒度：分钟（EmojiMinuteCount）、小时（EmojiHourlyCount）、天（EmojiDailyCount）。
+发送/撤回表情时在同一事务内增量更新三张表中 (课程, 时间桶, 类型) 的计数，
+统计页面与图表只读汇总表，查询代价取决于时间桶数量而不是表情数量。
+按时间范围统计数量（type_counts / hourly_counts）时，范围两端不足一小时的部分直接统计原始 emoji 表，
+结果与按 emoji.time 精确过滤一致；时间线（bucket_counts）则按整桶计数。
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, update
+
+from app import db
+from app.models import Emoji, EmojiMinuteCount, EmojiHourlyCount, EmojiDailyCount
+
+EMOJI_TYPES = range(1, 11)  # 统计只关心 1-10 类型
+REBUILD_BATCH_SIZE = 1000
+
+
+def minute_bucket(value):
+    """时间取整到分钟"""
+    return value.replace(second=0, microsecond=0)
+
+
+def hour_bucket(value):
+    """时间取整到小时"""
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def day_bucket(value):
+    """时间取整到当天零点"""
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+# 汇总粒度：名称 -> (汇总表模型, Python 取整函数, MySQL / SQLite 的取整格式)
+RESOLUTIONS = {
+    'minute': (EmojiMinuteCount, minute_bucket, ('%Y-%m-%d %H:%i:00', '%Y-%m-%d %H:%M:00')),
+    'hour': (EmojiHourlyCount, hour_bucket, ('%Y-%m-%d %H:00:00', '%Y-%m-%d %H:00:00')),
+    'day': (EmojiDailyCount, day_bucket, ('%Y-%m-%d 00:00:00', '%Y-%m-%d 00:00:00')),
+}
+
+
+def bucket_expr(column, dialect_name, resolution='hour'):
+    """在 SQL 中把时间列取整到 resolution（返回字符串或时间，取决于数据库）"""
+    mysql_format, sqlite_format = RESOLUTIONS[resolution][2]
+    if dialect_name == 'mysql':
+        return func.date_format(column, mysql_format)
+    if dialect_name == 'postgresql':
+        return func.date_trunc(resolution, column)
+    # SQLite
+    return func.strftime(sqlite_format, column)
+
+
+def hour_bucket_expr(column, dialect_name):
+    """在 SQL 中把时间列取整到小时"""
+    return bucket_expr(column, dialect_name, 'hour')
+
+
+def _as_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    return datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
+
+
+def _dialect_name(session):
+    return session.get_bind().dialect.name
+
+
+def _get(row, key):
+    return row[key] if isinstance(row, dict) else getattr(row, key)
+
+
+# ---------------- 增量维护 ----------------
+
+def apply_counts(session, counts, model=EmojiHourlyCount):
+    """
+    把 {(course_id, bucket, type): 增量} 合并进 model 对应的汇总表（增量可为负）
+    只写数据库，不提交，由调用方控制事务
+    """
+    # 汇总表的列名与属性名不同（Course_ID / course_id），Core 语句按列名传参
+    params = [{'Course_ID': course_id, 'bucket': bucket, 'type': emoji_type, 'count': n}
+              for (course_id, bucket, emoji_type), n in counts.items() if n]
+    if not params:
+        return
+
+    table = model.__table__
+    dialect_name = _dialect_name(session)
+
+    if dialect_name == 'mysql':
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(table)
+        stmt = stmt.on_duplicate_key_update(count=table.c.count + stmt.inserted['count'])
+        session.execute(stmt, params)
+    elif dialect_name in ('sqlite', 'postgresql'):
+        if dialect_name == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as upsert_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as upsert_insert
+        stmt = upsert_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.Course_ID, table.c.bucket, table.c.type],
+            set_={'count': table.c.count + stmt.excluded['count']}
+        )
+        session.execute(stmt, params)
+    else:
+        # 其它数据库：先 UPDATE，不存在再 INSERT
+        for p in params:
+            result = session.execute(
+                update(table)
+                .where(table.c.Course_ID == p['Course_ID'],
+                       table.c.bucket == p['bucket'],
+                       table.c.type == p['type'])
+                .values(count=table.c.count + p['count'])
+            )
+            if result.rowcount == 0:
+                session.execute(insert(table), [p])
+
+
+def record(session, emojis, sign=1):
+    """
+    按一批 Emoji（模型对象或字典）更新分钟、小时、天三张汇总表
+    sign=1 表示新增，sign=-1 表示撤回
+    time 为空的旧数据不计入汇总表（与 rebuild 一致），这里同样跳过
+    """
+    rows = [(_get(emoji, 'course_id'), _get(emoji, 'time'), _get(emoji, 'type')) for emoji in emojis]
+    rows = [row for row in rows if row[1] is not None]
+    for model, to_bucket, _ in RESOLUTIONS.values():
+        counts = Counter()
+        for course_id, time, emoji_type in rows:
+            counts[(course_id, to_bucket(time), emoji_type)] += sign
+        apply_counts(session, counts, model)
+
+
+def rebuild(session, course_id=None):
+    """
+    从原始 emoji 表重建三张汇总表（全部课程或指定课程），返回 {粒度: 写入的时间桶数量}
+    聚合在数据库中完成，Python 端只处理时间桶
+    """
+    return {resolution: _rebuild_table(session, resolution, course_id) for resolution in RESOLUTIONS}
+
+
+def _rebuild_table(session, resolution, course_id):
+    table = RESOLUTIONS[resolution][0].__table__
+    clear = delete(table)
+    if course_id is not None:
+        clear = clear.where(table.c.Course_ID == course_id)
+    session.execute(clear)
+
+    bucket = bucket_expr(Emoji.time, _dialect_name(session), resolution)
+    query = session.query(
+        Emoji.course_id, bucket, Emoji.type, func.count()
+    ).filter(Emoji.time.isnot(None))
+    if course_id is not None:
+        query = query.filter(Emoji.course_id == course_id)
+    query = query.group_by(Emoji.course_id, bucket, Emoji.type)
+
+    total = 0
+    batch = []
+    for cid, b, emoji_type, n in query:
+        batch.append({'Course_ID': cid, 'bucket': _as_datetime(b), 'type': emoji_type, 'count': n})
+        if len(batch) >= REBUILD_BATCH_SIZE:
+            session.execute(insert(table), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        session.execute(insert(table), batch)
+        total += len(batch)
+    return total
+
+
+# ---------------- 查询 ----------------
+
+def _window_filter(query, course_id, start_time, end_time, resolution='hour'):
+    """与 [start_time, end_time] 有重叠的时间桶，两端的时间桶整桶计入"""
+    model, to_bucket, _ = RESOLUTIONS[resolution]
+    query = query.filter(model.course_id == course_id,
+                         model.type.between(1, 10))
+    # 起始时间所在的时间桶也计入
+    if start_time is not None:
+        query = query.filter(model.bucket >= to_bucket(start_time))
+    if end_time is not None:
+        query = query.filter(model.bucket <= end_time)
+    return query
+
+
+def _split_hours(start_time, end_time):
+    """
+    把 [start_time, end_time] 拆成小时汇总表能精确统计的整小时 [first, last)，
+    和两端不足一小时的部分 [(所在整点, 起, 止, 是否包含止)]；first / last 为 None 表示不限，
+    整小时部分为空时 first 为 False
+    """
+    first = last = None
+    edges = []
+    if start_time is not None:
+        first = hour_bucket(start_time)
+        if first < start_time:
+            first += timedelta(hours=1)
+    if end_time is not None:
+        last = hour_bucket(end_time)
+    if first is not None and last is not None and first > last:
+        # 整个范围在同一个小时内
+        return False, last, [(last, start_time, end_time, True)]
+    if first is not None and start_time < first:
+        edges.append((hour_bucket(start_time), start_time, first, False))
+    if last is not None:
+        edges.append((last, last, end_time, True))
+    return first, last, edges
+
+
+def _full_hours_filter(query, course_id, first, last):
+    query = query.filter(EmojiHourlyCount.course_id == course_id,
+                         EmojiHourlyCount.type.between(1, 10))
+    if first is not None:
+        query = query.filter(EmojiHourlyCount.bucket >= first)
+    if last is not None:
+        query = query.filter(EmojiHourlyCount.bucket < last)
+    return query
+
+
+def _edge_counts(course_id, edges):
+    """两端不足一小时的部分直接统计原始 emoji 表（走 (课程, 时间) 索引，最多扫描两个小时的行）"""
+    rows = []
+    for bucket, lower, upper, inclusive in edges:
+        query = db.session.query(Emoji.type, func.count()).filter(
+            Emoji.course_id == course_id,
+            Emoji.type.between(1, 10),
+            Emoji.time >= lower,
+            Emoji.time <= upper if inclusive else Emoji.time < upper)
+        rows.extend((bucket, t, n) for t, n in query.group_by(Emoji.type) if n > 0)
+    return rows
+
+
+def type_counts(course_id, start_time=None, end_time=None):
+    """返回 [start_time, end_time] 内的 {类型: 数量}，1-10 类型全部给出（没有数据为 0）"""
+    first, last, edges = _split_hours(start_time, end_time)
+    counts = {t: 0 for t in EMOJI_TYPES}
+    if first is not False:
+        query = db.session.query(EmojiHourlyCount.type, func.sum(EmojiHourlyCount.count))
+        query = _full_hours_filter(query, course_id, first, last)
+        for emoji_type, n in query.group_by(EmojiHourlyCount.type):
+            counts[emoji_type] = int(n or 0)
+    for _, emoji_type, n in _edge_counts(course_id, edges):
+        counts[emoji_type] += n
+    return counts
+
+
+def bucket_counts(resolution, course_id, start_time=None, end_time=None):
+    """返回 resolution 粒度的 [(时间桶, 类型, 数量), ...]，按时间升序，只包含有数据的桶"""
+    model = RESOLUTIONS[resolution][0]
+    query = db.session.query(model.bucket, model.type, model.count)
+    query = _window_filter(query, course_id, start_time, end_time, resolution)
+    return [(b, t, n) for b, t, n in query.order_by(model.bucket) if n > 0]
+
+
+def all_type_counts():
+    """全部课程全部时间的 {课程: {类型: 数量}}，一次按 (课程, 类型) 聚合按天汇总表"""
+    query = db.session.query(
+        EmojiDailyCount.course_id, EmojiDailyCount.type, func.sum(EmojiDailyCount.count)
+    ).filter(EmojiDailyCount.type.between(1, 10)).group_by(EmojiDailyCount.course_id, EmojiDailyCount.type)
+    counts = {}
+    for course_id, emoji_type, n in query:
+        counts.setdefault(course_id, {})[emoji_type] = int(n or 0)
+    return counts
+
+
+def hourly_counts(course_id, start_time=None, end_time=None):
+    """
+    返回 [start_time, end_time] 内的 [(整点, 类型, 数量), ...]，按时间升序，只包含有数据的桶
+    两端的整点只计入范围内的表情
+    """
+    first, last, edges = _split_hours(start_time, end_time)
+    rows = []
+    if first is not False:
+        query = db.session.query(EmojiHourlyCount.bucket, EmojiHourlyCount.type, EmojiHourlyCount.count)
+        query = _full_hours_filter(query, course_id, first, last)
+        rows = [(b, t, n) for b, t, n in query.order_by(EmojiHourlyCount.bucket) if n > 0]
+    rows.extend(_edge_counts(course_id, edges))
+    return sorted(rows, key=lambda row: (row[0], row[1]))
+
+
+def course_extent(course_id):
+    """课程第一条和最后一条表情所在的日期（按天汇总表的主键范围查询），没有数据时为 (None, None)"""
+    first, last = db.session.query(
+        func.min(EmojiDailyCount.bucket), func.max(EmojiDailyCount.bucket)
+    ).filter(EmojiDailyCount.course_id == course_id, EmojiDailyCount.count > 0).one()
+    return first, last
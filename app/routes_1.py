@@ -1,17 +1,27 @@
-from flask import render_template, redirect, url_for, flash, request, session
-from datetime import datetime
-import uuid
-
-from app import app, db
-from app.models import User, Course, Student_Course, Emoji
+# app/routes_1.py
+# 学生端：课程列表、发送和撤回表情、历史记录（ingest 配置只注册本蓝图和 auth）
+from flask import Blueprint, current_app, render_template, redirect, url_for, flash, request, session, jsonify
+from datetime import datetime, timedelta
+
+from app import db, emoji_buffer, live_counters, live_feed
+from app.emoji_buffer import BufferFullError
+from app.ids import new_emoji_id
+from app import rollup
+from app.models import Course, Student_Course, Emoji
 from config import EMOJI_TYPE_MAP
 
+bp = Blueprint('student', __name__)
+
+@bp.route('/welcome_student')
+def welcome_student():
+    return render_template('welcome_student.html', user_name=session.get('user_name'))
+
 # 查看学生端课程列表
-@app.route('/student/courses')
+@bp.route('/student/courses')
 def student_courses():
     if session.get('user_type') != 3:
         flash('无权限访问学生端功能', 'danger')
-        return redirect(url_for('welcome'))
+        return redirect(url_for('auth.welcome'))
 
     student_id = session['user_id']
     courses = Course.query.join(Student_Course)\
@@ -22,54 +32,154 @@ def student_courses():
 
 
 # 发送 Emoji 功能
-@app.route('/student/course/<course_id>/send_emoji', methods=['POST'])
+@bp.route('/student/course/<course_id>/send_emoji', methods=['POST'])
 def send_emoji(course_id):
     if session.get('user_type') != 3:
         flash('无权限访问学生端功能', 'danger')
-        return redirect(url_for('welcome'))
+        return redirect(url_for('auth.welcome'))
 
     student_id = session['user_id']
-    emoji_type = int(request.form.get('emoji_type'))
+    emoji_type = request.form.get('emoji_type', type=int)
+    # 批量写入不经过模型校验，这里提前检查表情类型
+    if emoji_type not in EMOJI_TYPE_MAP:
+        flash('无效的表情类型', 'danger')
+        return redirect(url_for('student.student_courses'))
+
+    # 先进入写缓冲，由后台线程批量写库
+    try:
+        emoji_buffer.submit({
+            'id': new_emoji_id(),
+            'student_id': student_id,
+            'course_id': course_id,
+            'time': datetime.now(),
+            'type': emoji_type
+        })
+    except BufferFullError:
+        flash('当前发送人数过多，请稍后重试', 'warning')
+        return redirect(url_for('student.student_courses'))
 
-    new_emoji = Emoji(
-        id=str(uuid.uuid4())[:8],
-        student_id=student_id,
-        course_id=course_id,
-        time=datetime.now(),
-        type=emoji_type
-    )
+    flash('Emoji 发送成功！', 'success')
+    return redirect(url_for('student.student_courses'))
+
+def parse_client_time(value, now):
+    """
+    解析客户端发送时间：ISO 8601 字符串或毫秒时间戳，缺省为服务器当前时间
+    稍快于服务器的时钟按当前时间处理；早于允许延迟或无法解析时返回 None
+    """
+    if value is None:
+        return now
+    try:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            sent_at = datetime.fromtimestamp(value / 1000)
+        else:
+            sent_at = datetime.fromisoformat(str(value))
+            if sent_at.tzinfo is not None:
+                sent_at = sent_at.astimezone().replace(tzinfo=None)
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+    if sent_at > now:
+        return now
+    if now - sent_at > timedelta(seconds=current_app.config['EMOJI_API_MAX_CLIENT_DELAY']):
+        return None
+    return sent_at
+
+# 批量发送 Emoji（JSON 接口）
+@bp.route('/student/api/emojis', methods=['POST'])
+def send_emojis_json():
+    """
+    请求体为单个对象或对象数组，每项形如 {"course_id": "C1", "type": 2, "time": 1733030400000}
+    返回与请求顺序一致的结果：{"accepted": 1, "results": [{"id": "..."}, {"error": "invalid_type"}]}
+    """
+    if session.get('user_type') != 3:
+        return jsonify(error='forbidden'), 403
 
-    db.session.add(new_emoji)
-    db.session.commit()
+    payload = request.get_json(silent=True)
+    if isinstance(payload, dict):
+        items = [payload]
+    elif isinstance(payload, list):
+        items = payload
+    else:
+        return jsonify(error='invalid_json'), 400
 
-    flash('Emoji 发送成功！', 'success')
-    return redirect(url_for('student_courses'))
+    if len(items) > current_app.config['EMOJI_API_MAX_BATCH']:
+        return jsonify(error='batch_too_large', limit=current_app.config['EMOJI_API_MAX_BATCH']), 413
+
+    student_id = session['user_id']
+    # 一次查询取出该学生已选的全部课程
+    enrolled_course_ids = {course_id for (course_id,) in
+                           db.session.query(Student_Course.course_id)
+                                     .filter_by(student_id=student_id)}
+
+    now = datetime.now()
+    rows = []
+    results = []
+    for item in items:
+        if not isinstance(item, dict):
+            results.append({'error': 'invalid_item'})
+            continue
+
+        emoji_type = item.get('type')
+        if type(emoji_type) is not int or emoji_type not in EMOJI_TYPE_MAP:
+            results.append({'error': 'invalid_type'})
+            continue
+
+        course_id = item.get('course_id')
+        if not isinstance(course_id, str) or course_id not in enrolled_course_ids:
+            results.append({'error': 'not_enrolled'})
+            continue
+
+        sent_at = parse_client_time(item.get('time'), now)
+        if sent_at is None:
+            results.append({'error': 'invalid_time'})
+            continue
+
+        row = {
+            'id': new_emoji_id(),
+            'student_id': student_id,
+            'course_id': course_id,
+            'time': sent_at,
+            'type': emoji_type
+        }
+        rows.append(row)
+        results.append({'id': row['id']})
+
+    # 整批一条 INSERT 同步写入，返回的结果即为最终结果
+    try:
+        emoji_buffer.write(rows)
+    except Exception:
+        return jsonify(error='write_failed'), 500
+
+    return jsonify(accepted=len(rows), results=results)
 
 # 撤回 Emoji 功能
-@app.route('/student/emoji/<emoji_id>/delete')
+@bp.route('/student/emoji/<emoji_id>/delete')
 def delete_emoji(emoji_id):
     if session.get('user_type') != 3:
         flash('无权限访问学生端功能', 'danger')
-        return redirect(url_for('welcome'))
+        return redirect(url_for('auth.welcome'))
 
     emoji = Emoji.query.get_or_404(emoji_id)
 
     if emoji.student_id != session['user_id']:
         flash('你不能删除不是你发的 Emoji', 'danger')
-        return redirect(url_for('welcome'))
+        return redirect(url_for('auth.welcome'))
 
+    rollup.record(db.session, [emoji], sign=-1)
     db.session.delete(emoji)
     db.session.commit()
+    live_counters.record([emoji], sign=-1)
+    live_feed.publish([emoji], sign=-1)
 
     flash('Emoji 已删除', 'success')
-    return redirect(url_for('student_emoji_history'))
+    return redirect(url_for('student.student_emoji_history'))
 
 # 查看学生端 Emoji 历史记录
-@app.route('/student/emoji/history')
+@bp.route('/student/emoji/history')
 def student_emoji_history():
     if session.get('user_type') != 3:
         flash('无权限访问学生端功能', 'danger')
-        return redirect(url_for('welcome'))
+        return redirect(url_for('auth.welcome'))
 
     student_id = session['user_id']
     history = Emoji.query.filter(
@@ -78,48 +188,3 @@ def student_emoji_history():
     ).order_by(Emoji.time.desc()).all()
 
     return render_template('student/history.html', history=history)
-
-
-# 教师端
-
-@app.route('/teacher/courses')
-def teacher_courses():
-    if session.get('user_type') != 2:
-        flash('无权限访问教师端功能', 'danger')
-        return redirect(url_for('welcome'))
-
-    teacher_id = session['user_id']
-    courses = Course.query.filter_by(teacher_id=teacher_id).all()
-
-    return render_template('teacher/courses.html', courses=courses)
-
-@app.route('/teacher/course/<course_id>/timeline')
-def teacher_course_timeline(course_id):
-    if session.get('user_type') != 2:
-        flash('无权限访问教师端功能', 'danger')
-        return redirect(url_for('welcome'))
-
-    emojis = Emoji.query.filter(Emoji.course_id == course_id,
-                              Emoji.type.between(1, 10))\
-                        .options(db.joinedload(Emoji.student))\
-                        .options(db.joinedload(Emoji.course))\
-                        .order_by(Emoji.time.asc()).all()
-
-    return render_template('teacher/timeline.html', emojis=emojis)
-
-@app.route('/teacher/course/<course_id>/stats')
-def teacher_course_stats(course_id):
-    if session.get('user_type') != 2:
-        flash('无权限访问教师端功能', 'danger')
-        return redirect(url_for('welcome'))
-
-    stats = db.session.query(
-        Emoji.type,
-        db.func.count(Emoji.type)
-    ).filter(
-        Emoji.course_id == course_id,
-        Emoji.type.between(1, 10)  # 只选择1-10类型
-    ).group_by(Emoji.type).all()
-
-    return render_template('teacher/stats.html', stats=stats)
-
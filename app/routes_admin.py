@@ -0,0 +1,670 @@
+# app/routes_admin.py
+# 管理员：教师、学生、课程管理，批量导入和选课，表情历史导出，性能指标
+from flask import Blueprint, current_app, render_template, redirect, url_for, flash, request, session, Response, stream_with_context
+from app import db, search_index, metrics
+from app.forms import UserRegistrationForm, UserProfileEditForm, CourseForm
+from app.models import User, Course, Student_Course, Emoji
+from app import purge
+from app.enrollment import enroll_students, not_enrolled, parse_student_ids
+from app.pagination import paginate_request
+from config import EMOJI_TYPE_MAP
+from werkzeug.security import generate_password_hash
+from sqlalchemy import select
+from datetime import datetime
+import io
+import csv
+import zlib
+
+bp = Blueprint('admin', __name__)
+
+# 流式导出 CSV 时每攒够多少字节发送一次
+CSV_FLUSH_SIZE = 64 * 1024
+
+@bp.route('/welcome_admin')
+def welcome_admin():
+    return render_template('welcome_admin.html', user_name=session.get('user_name'))
+
+# 管理员查询教师
+@bp.route('/admin/teacher', methods=['GET'])
+def teacher():
+    # 获取搜索参数
+    search_query = request.args.get('search', '').strip()
+    
+    # 基础查询
+    query = User.query.filter_by(user_type=2)
+    
+    # 如果有搜索条件
+    if search_query:
+        query = query.filter(search_index.condition(User, search_query))
+
+    # 按主键游标分页，每次只读取一页
+    page = paginate_request(query, User.id)
+    teachers = page.items
+    form = UserRegistrationForm()
+    return render_template('admin/teacher.html', teachers=teachers, page=page, form=form)
+
+# Edit Teacher
+@bp.route('/admin/edit_teacher/<string:teacher_id>', methods=['GET', 'POST'])
+def edit_teacher(teacher_id):
+    teacher = User.query.get_or_404(teacher_id)
+    form = UserProfileEditForm(obj=teacher)
+    if form.validate_on_submit():
+        try:
+            teacher.name = form.name.data
+            teacher.mail = form.mail.data
+            teacher.tele_num = form.tele_num.data
+            db.session.commit()
+            flash('成功更新教师！')
+        except Exception as e:
+            db.session.rollback()
+            flash(f'更新教师失败: {e}', 'danger')
+        return redirect(url_for('admin.edit_teacher', teacher_id=teacher.id))
+    return render_template('admin/edit_teacher.html', form=form, teacher=teacher)
+
+# Add Teacher
+@bp.route('/admin/add_teacher', methods=['GET', 'POST'])
+def add_teacher():
+    form = UserRegistrationForm()
+    form.user_type.data = 2  # 默认设置为教师类型
+    if form.validate_on_submit():
+        # 检查用户是否已存在
+        existing_user = User.query.filter_by(id=form.user_id.data).first()
+        if existing_user:
+            flash('用户ID已存在，请选择其他ID', 'danger')
+            return render_template('admin/add_teacher.html', form=form)
+        
+        # 检查邮箱是否已被使用
+        existing_email = User.query.filter_by(mail=form.mail.data).first()
+        if existing_email:
+            flash('该邮箱已被注册，请使用其他邮箱', 'danger')
+            return render_template('admin/add_teacher.html', form=form)
+        
+        # 检查电话号码是否已被使用
+        existing_tele_num = User.query.filter_by(tele_num=form.tele_num.data).first()
+        if existing_tele_num:
+            flash('该电话号码已被注册，请使用其他号码', 'danger')
+            return render_template('admin/add_teacher.html', form=form)
+        try:
+            teacher = User(
+                id=form.user_id.data,
+                name=form.name.data,
+                mail=form.mail.data,
+                tele_num=form.tele_num.data,
+                key=generate_password_hash(form.key.data),  # 使用哈希存储密码
+                user_type=2  # 教师类型
+            )
+            db.session.add(teacher)
+            db.session.commit()
+            flash('成功添加教师！')
+            return redirect(url_for('admin.teacher'))
+        except Exception as e:
+            db.session.rollback()
+            flash(f'添加教师失败: {e}', 'danger')
+    return render_template('admin/add_teacher.html', form=form)
+
+# Delete Teacher
+@bp.route('/admin/delete_teacher/<string:teacher_id>', methods=['POST'])
+def delete_teacher(teacher_id):
+    try:
+        teacher = User.query.get_or_404(teacher_id)
+        # 添加用户类型验证，确保只有教师类型(2)才能被删除
+        if teacher.user_type != 2:
+            flash('只能删除教师类型的用户！', 'danger')
+            return redirect(url_for('admin.teacher'))
+        
+        # 分批删除教师开设的课程及其表情、选课记录，内存占用与数据量无关
+        deleted = purge.purge_teacher(teacher.id)
+        flash(f"成功删除教师！同时删除课程 {deleted['course']} 门、表情 {deleted['emoji']} 条")
+    except purge.PurgeError as e:
+        # 已经删除了一部分，提示可以重新执行
+        flash(str(e), 'danger')
+    except Exception as e:
+        db.session.rollback()
+        flash(f'删除教师失败: {e}', 'danger')
+    return redirect(url_for('admin.teacher'))
+
+# 管理员查询学生
+@bp.route('/admin/student', methods=['GET'])
+def student():
+    # 获取搜索参数
+    search_query = request.args.get('search', '').strip()
+    
+    # 基础查询
+    query = User.query.filter_by(user_type=3)
+    
+    # 如果有搜索条件
+    if search_query:
+        query = query.filter(search_index.condition(User, search_query))
+
+    # 按主键游标分页，每次只读取一页
+    page = paginate_request(query, User.id)
+    students = page.items
+    form = UserRegistrationForm()
+    return render_template('admin/student.html', students=students, page=page, form=form)
+
+# Edit Student
+@bp.route('/admin/edit_student/<string:student_id>', methods=['GET', 'POST'])
+def edit_student(student_id):
+    student = User.query.get_or_404(student_id)
+    form = UserProfileEditForm(obj=student)
+    # 获取已选的课程
+    enrolled_courses = db.session.query(Course).join(Student_Course).filter(
+        Student_Course.student_id == student_id
+    ).all()
+    # 搜索参数
+    search_query = request.args.get('search', '').strip()
+    if search_query:
+        enrolled_courses = db.session.query(Course).join(Student_Course).filter(
+            Student_Course.student_id == student_id,
+            search_index.condition(Course, search_query)
+        ).all()
+    if form.validate_on_submit():
+        try:
+            student.name = form.name.data
+            student.mail = form.mail.data
+            student.tele_num = form.tele_num.data
+            db.session.commit()
+            flash('成功更新学生！')
+        except Exception as e:
+            db.session.rollback()
+            flash(f'更新学生失败: {e}', 'danger')
+        return redirect(url_for('admin.edit_student', student_id=student.id))
+    return render_template('admin/edit_student.html', form=form, student=student, enrolled_courses=enrolled_courses, search_query=search_query)
+
+# delete course from student
+@bp.route('/admin/delete_course_from_student/<string:course_id>/<string:student_id>', methods=['POST'])
+def delete_course_from_student(course_id, student_id):
+    try:
+        student_course = Student_Course.query.filter_by(
+            course_id=course_id, 
+            student_id=student_id
+        ).first_or_404()  
+        db.session.delete(student_course)
+        db.session.commit()
+        flash('成功删除学生选课！', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash(f'删除学生选课失败: {e}', 'danger')
+    return redirect(url_for('admin.edit_student', student_id=student_id))
+
+# add course to student
+@bp.route('/admin/add_course_to_student/<string:student_id>', methods=['GET', 'POST'])
+def add_course_to_student(student_id):
+    student = User.query.get_or_404(student_id)
+
+    # 搜索参数
+    search_query = request.args.get('search', '').strip()
+    
+    # 该学生未选的课程（NOT EXISTS 反连接，不必先读出已选课程）
+    available_courses = Course.query.filter(~db.exists().where(
+        Student_Course.course_id == Course.id,
+        Student_Course.student_id == student_id
+    ))
+
+    # 如果有搜索条件
+    if search_query:
+        available_courses = available_courses.filter(search_index.condition(Course, search_query))
+
+    available_courses = available_courses.all()
+
+    # 处理添加学生选课
+    if request.method == 'POST':
+        course_id = request.form.get('course_id')
+        if course_id:
+            try:
+                result = enroll_students(course_id, [student_id])
+                db.session.commit()
+                if result.unknown_ids:
+                    flash('只能为学生类型的用户选课！', 'danger')
+                elif not result.added:
+                    flash('该学生已经选过此课程！', 'warning')
+                else:
+                    flash('成功添加学生选课！', 'success')
+                    
+                    # 重定向回添加页面，可以继续添加
+                    return redirect(url_for('admin.add_course_to_student', student_id=student_id))
+
+            except Exception as e:
+                db.session.rollback()
+                flash(f'添加学生选课失败: {e}', 'danger')
+
+    return render_template('admin/add_course_to_student.html',
+                         student=student,
+                         available_courses=available_courses,
+                         search_query=search_query)
+
+# Add Student
+@bp.route('/admin/add_student', methods=['GET', 'POST'])
+def add_student():
+    form = UserRegistrationForm()
+    form.user_type.data = 3  # 默认设置为学生类型
+    if form.validate_on_submit():
+        # 检查用户是否已存在
+        existing_user = User.query.filter_by(id=form.user_id.data).first()
+        if existing_user:
+            flash('用户ID已存在，请选择其他ID', 'danger')
+            return render_template('admin/add_student.html', form=form)
+        
+        # 检查邮箱是否已被使用
+        existing_email = User.query.filter_by(mail=form.mail.data).first()
+        if existing_email:
+            flash('该邮箱已被注册，请使用其他邮箱', 'danger')
+            return render_template('admin/add_student.html', form=form)
+        
+        # 检查电话号码是否已被使用
+        existing_tele_num = User.query.filter_by(tele_num=form.tele_num.data).first()
+        if existing_tele_num:
+            flash('该电话号码已被注册，请使用其他号码', 'danger')
+            return render_template('admin/add_student.html', form=form)
+        
+        try:
+            student = User(
+                id=form.user_id.data,
+                name=form.name.data,
+                mail=form.mail.data,
+                tele_num=form.tele_num.data,
+                key=generate_password_hash(form.key.data),  # 使用哈希存储密码
+                user_type=3  # 学生类型
+            )
+            db.session.add(student)
+            db.session.commit()
+            flash('成功添加学生！')
+            return redirect(url_for('admin.student'))
+        except Exception as e:
+            db.session.rollback()
+            flash(f'添加学生失败: {e}', 'danger')
+    return render_template('admin/add_student.html', form=form)
+
+# 批量导入用户（CSV）
+@bp.route('/admin/import_users', methods=['GET', 'POST'])
+def import_users():
+    if session.get('user_type') != 1:
+        flash('无权限访问管理员功能', 'danger')
+        return redirect(url_for('auth.welcome'))
+
+    report = None
+    if request.method == 'POST':
+        upload = request.files.get('csv_file')
+        user_type = request.form.get('user_type', 3, type=int)
+        if upload is None or not upload.filename:
+            flash('请选择要导入的 CSV 文件', 'danger')
+        elif user_type not in (1, 2, 3):
+            flash('用户类型必须是1(管理员)、2(教师)或3(学生)', 'danger')
+        else:
+            try:
+                text = upload.read().decode('utf-8-sig')
+            except UnicodeDecodeError:
+                flash('CSV 文件必须使用 UTF-8 编码', 'danger')
+            else:
+                # 只有导入时才加载（依赖 email_validator）
+                from app import user_import
+
+                report = user_import.import_users(text, default_user_type=user_type,
+                                                  dry_run=bool(request.form.get('dry_run')))
+                if report.ok and report.inserted:
+                    flash(f'成功导入 {report.inserted} 个用户！', 'success')
+                elif report.ok:
+                    flash(f'共 {report.total} 行，校验通过', 'success')
+                else:
+                    flash(f'共 {report.total} 行，{len(report.errors)} 行有错误，未导入任何用户', 'danger')
+
+    return render_template('admin/import_users.html', report=report)
+
+# Delete Student
+@bp.route('/admin/delete_student/<string:student_id>', methods=['POST'])
+def delete_student(student_id):
+    try:
+        student = User.query.get_or_404(student_id)
+        # 添加用户类型验证，确保只有学生类型(3)才能被删除
+        if student.user_type != 3:
+            flash('只能删除学生类型的用户！', 'danger')
+            return redirect(url_for('admin.student'))
+        # 分批删除学生的表情（同时扣减汇总表）和选课记录
+        deleted = purge.purge_student(student.id)
+        flash(f"成功删除学生！同时删除表情 {deleted['emoji']} 条")
+    except purge.PurgeError as e:
+        # 已经删除了一部分，提示可以重新执行
+        flash(str(e), 'danger')
+    except Exception as e:
+        db.session.rollback()
+        flash(f'删除学生失败: {e}', 'danger')
+    return redirect(url_for('admin.student'))
+
+# 管理员查询课程
+@bp.route('/admin/course', methods=['GET'])
+def course():
+    # 获取搜索参数
+    search_query = request.args.get('search', '').strip()
+    
+    # 基础查询
+    query = Course.query
+    
+    # 如果有搜索条件
+    if search_query:
+        query = query.filter(search_index.condition(Course, search_query))
+    
+    # 按主键游标分页，每次只读取一页
+    page = paginate_request(query, Course.id)
+    courses = page.items
+    form = CourseForm()
+    return render_template('admin/course.html', courses=courses, page=page, form=form)
+
+# Edit Course
+@bp.route('/admin/edit_course/<string:course_id>', methods=['GET', 'POST'])
+def edit_course(course_id):
+    course = Course.query.get_or_404(course_id)
+    form = CourseForm(obj=course)
+    # 获取所有教师数据
+    teachers = User.query.filter_by(user_type=2).all()  # user_type=2 代表教师
+    # 构建下拉列表选项：[(教师ID, 教师姓名(教师ID)), ...]
+    teacher_choices = [(teacher.id, f"{teacher.name} ({teacher.id})") for teacher in teachers]
+    form.teacher_id.choices = teacher_choices
+    
+    # 获取已选课的学生
+    enrolled_students = db.session.query(User).join(Student_Course).filter(
+        Student_Course.course_id == course_id
+    ).all()
+    
+    # 搜索参数
+    search_query = request.args.get('search', '').strip()
+    
+    if search_query:
+        enrolled_students = db.session.query(User).join(Student_Course).filter(
+            Student_Course.course_id == course_id,
+            search_index.condition(User, search_query)
+        ).all()
+    
+    if form.validate_on_submit():
+        try:
+            course.name = form.name.data
+            course.teacher_id = form.teacher_id.data
+            db.session.commit()
+            flash('成功更新课程！', 'success')
+        except Exception as e:
+            db.session.rollback()
+            flash(f'更新课程失败: {e}', 'danger')
+        return redirect(url_for('admin.edit_course', course_id=course.id))
+    
+    return render_template('admin/edit_course.html', 
+                         form=form, 
+                         course=course,
+                         enrolled_students=enrolled_students,
+                         search_query=search_query)
+
+# delete student from course
+@bp.route('/admin/delete_student_from_course/<string:course_id>/<string:student_id>', methods=['POST'])
+def delete_student_from_course(course_id, student_id):
+    try:
+        student_course = Student_Course.query.filter_by(
+            course_id=course_id, 
+            student_id=student_id
+        ).first_or_404()  
+        db.session.delete(student_course)
+        db.session.commit()
+        flash('成功删除学生选课！', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash(f'删除学生选课失败: {e}', 'danger')
+    return redirect(url_for('admin.edit_course', course_id=course_id))
+
+# add student to course
+@bp.route('/admin/add_student_to_course/<string:course_id>', methods=['GET', 'POST'])
+def add_student_to_course(course_id):
+    course = Course.query.get_or_404(course_id)
+    
+    # 搜索参数
+    search_query = request.args.get('search', '').strip()
+    
+    # 未选这门课的学生（NOT EXISTS 反连接，不必先读出已选学生）
+    available_students = User.query.filter(User.user_type == 3, not_enrolled(course_id))
+    
+    # 如果有搜索条件
+    if search_query:
+        available_students = available_students.filter(search_index.condition(User, search_query))
+    
+    available_students = available_students.all()
+    
+    # 处理添加学生选课
+    if request.method == 'POST':
+        student_id = request.form.get('student_id')
+        if student_id:
+            try:
+                result = enroll_students(course_id, [student_id])
+                db.session.commit()
+                if result.unknown_ids:
+                    flash('学生不存在！', 'danger')
+                elif not result.added:
+                    flash('该学生已经选过此课程！', 'warning')
+                else:
+                    flash('成功添加学生选课！', 'success')
+                    
+                    # 重定向回添加页面，可以继续添加
+                    return redirect(url_for('admin.add_student_to_course', course_id=course_id))
+                    
+            except Exception as e:
+                db.session.rollback()
+                flash(f'添加学生选课失败: {e}', 'danger')
+    
+    return render_template('admin/add_student_to_course.html',
+                         course=course,
+                         available_students=available_students,
+                         search_query=search_query)
+
+# 批量为课程添加学生：学号列表 / CSV / 学号前缀 / 另一门课程的学生
+@bp.route('/admin/bulk_enroll/<string:course_id>', methods=['POST'])
+def bulk_enroll(course_id):
+    if session.get('user_type') != 1:
+        flash('无权限访问管理员功能', 'danger')
+        return redirect(url_for('auth.welcome'))
+
+    Course.query.get_or_404(course_id)
+
+    text = request.form.get('student_ids', '')
+    upload = request.files.get('csv_file')
+    if upload is not None and upload.filename:
+        try:
+            text += '\n' + upload.read().decode('utf-8-sig')
+        except UnicodeDecodeError:
+            flash('CSV 文件必须使用 UTF-8 编码', 'danger')
+            return redirect(url_for('admin.add_student_to_course', course_id=course_id))
+    student_ids = parse_student_ids(text) or None
+    id_prefix = request.form.get('id_prefix', '').strip() or None
+    from_course_id = request.form.get('from_course_id', '').strip() or None
+
+    if student_ids is None and not id_prefix and not from_course_id:
+        flash('请填写学号、学号前缀或来源课程', 'warning')
+        return redirect(url_for('admin.add_student_to_course', course_id=course_id))
+
+    try:
+        result = enroll_students(course_id, student_ids, id_prefix=id_prefix, from_course_id=from_course_id)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        flash(f'批量添加学生失败: {e}', 'danger')
+        return redirect(url_for('admin.add_student_to_course', course_id=course_id))
+
+    flash(f'成功添加 {result.added} 名学生，{result.already_enrolled} 名已在课程中', 'success')
+    if result.unknown_ids:
+        shown = '、'.join(result.unknown_ids[:20])
+        more = f' 等 {len(result.unknown_ids)} 个' if len(result.unknown_ids) > 20 else ''
+        flash(f'以下学号未添加（不存在、不是学生或不满足其它条件）：{shown}{more}', 'warning')
+    return redirect(url_for('admin.add_student_to_course', course_id=course_id))
+
+# Add Course
+@bp.route('/admin/add_course', methods=['GET', 'POST'])
+def add_course():
+    form = CourseForm()
+
+    # 获取所有教师数据
+    teachers = User.query.filter_by(user_type=2).all()  # user_type=2 代表教师
+    # 构建下拉列表选项：[(教师ID, 教师姓名(教师ID)), ...]
+    teacher_choices = [(teacher.id, f"{teacher.name} ({teacher.id})") for teacher in teachers]
+    form.teacher_id.choices = teacher_choices
+
+    if form.validate_on_submit():
+        try:
+            # 再次验证教师是否存在（双重保险）
+            teacher = User.query.filter_by(id=form.teacher_id.data).first()
+            if not teacher:
+                flash('教师ID不存在，请检查后重新输入', 'danger')
+                return render_template('admin/add_course.html', form=form)
+            if teacher.user_type != 2:  # 2代表教师类型
+                flash('该用户不是教师，请选择有效的教师ID', 'danger')
+                return render_template('admin/add_course.html', form=form)
+            
+            # 检查课程ID是否已存在
+            existing_course = Course.query.filter_by(id=form.course_id.data).first()
+            if existing_course:
+                flash('课程ID已存在，请使用不同的课程ID', 'danger')
+                return render_template('admin/add_course.html', form=form)
+            
+            course = Course(
+                id=form.course_id.data,
+                name=form.name.data,
+                teacher_id=form.teacher_id.data
+            )
+            db.session.add(course)
+            db.session.commit()
+            flash('成功添加课程！')
+            return redirect(url_for('admin.course'))
+        except Exception as e:
+            db.session.rollback()
+            flash(f'添加课程失败: {e}', 'danger')
+    return render_template('admin/add_course.html', form=form)
+
+# Delete Course
+@bp.route('/admin/delete_course/<string:course_id>', methods=['POST'])
+def delete_course(course_id):
+    try:
+        course = Course.query.get_or_404(course_id)
+        # 分批删除课程的表情和选课记录，内存占用与历史数据量无关
+        deleted = purge.purge_course(course.id)
+        flash(f"成功删除课程！同时删除表情 {deleted['emoji']} 条、选课记录 {deleted['student__course']} 条")
+    except purge.PurgeError as e:
+        # 已经删除了一部分，提示可以重新执行
+        flash(str(e), 'danger')
+    except Exception as e:
+        db.session.rollback()
+        flash(f'删除课程失败: {e}', 'danger')
+    return redirect(url_for('admin.course'))
+
+# 管理员查看课程emoji历史(不包含学生信息)
+@bp.route('/admin/course_emoji_history/<string:course_id>', methods=['GET'])
+def course_emoji_history(course_id):
+    if session.get('user_type') != 1:
+        flash('无权限访问管理员功能', 'danger')
+        return redirect(url_for('auth.welcome'))
+    
+    # 获取课程信息
+    course = Course.query.get_or_404(course_id)
+    
+    # 获取emoji历史数据（只包含emoji基本信息，不包含学生信息）
+    emoji_history = Emoji.query.filter_by(course_id=course_id)\
+                            .filter(Emoji.type.between(1, 10))\
+                            .with_entities(
+                                  Emoji.id,
+                                  Emoji.course_id,
+                                  Emoji.type,
+                                  Emoji.time
+                            )\
+                            .order_by(Emoji.time.desc())\
+                            .all()
+    
+    return render_template('admin/course_emoji_history.html',
+                         course=course,
+                         emoji_history=emoji_history, EMOJI_TYPE_MAP=EMOJI_TYPE_MAP)
+
+# 导出课程emoji历史为CSV（不包含学生信息）
+@bp.route('/admin/export_emoji_history_csv/<string:course_id>')
+def export_emoji_history_csv(course_id):
+    """
+    导出课程emoji历史为CSV文件（不包含学生信息）
+    流式输出：按块从数据库读取、边生成边发送，内存占用与历史数据量无关
+    带参数 gzip=1 时输出 gzip 压缩的 .csv.gz 文件
+    """
+    if session.get('user_type') != 1:
+        flash('无权限访问管理员功能', 'danger')
+        return redirect(url_for('auth.welcome'))
+    
+    # 获取课程信息
+    course = Course.query.get_or_404(course_id)
+    
+    # 获取emoji历史数据（与查看函数相同的查询逻辑），使用服务端游标分块读取
+    emoji_history = select(
+        Emoji.id,
+        Emoji.course_id,
+        Emoji.type,
+        Emoji.time
+    ).where(
+        Emoji.course_id == course_id,
+        Emoji.type.between(1, 10)  # 只选择1-10类型
+    ).order_by(Emoji.time.desc())
+    chunk_size = current_app.config['CSV_EXPORT_CHUNK_SIZE']
+    engine = db.engine
+
+    def generate_csv():
+        output = io.StringIO()
+        writer = csv.writer(output)
+        
+        # 写入CSV头部
+        writer.writerow(['Emoji ID', '课程ID', '表情类型', '表情名字',  '发送时间'])
+        
+        # 游标在生成器内单独取一个连接，读完、出错或客户端中途断开（生成器被关闭）时都归还连接池
+        with engine.connect() as conn:
+            rows = conn.execution_options(yield_per=chunk_size).execute(emoji_history)
+            # 写入数据行，缓冲区攒够一定大小就发送一次
+            for emoji_id, emoji_course_id, emoji_type, emoji_time in rows:
+                writer.writerow([
+                    emoji_id,
+                    emoji_course_id,
+                    f'{emoji_type}',
+                    EMOJI_TYPE_MAP.get(emoji_type, '未知表情'),
+                    emoji_time.strftime('%Y-%m-%d %H:%M:%S')
+                ])
+                if output.tell() >= CSV_FLUSH_SIZE:
+                    yield output.getvalue().encode('utf-8')
+                    output.seek(0)
+                    output.truncate()
+        yield output.getvalue().encode('utf-8')
+
+    def generate_gzip(chunks):
+        compressor = zlib.compressobj(wbits=31)  # wbits=31 输出 gzip 格式
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+
+    # 准备响应
+    filename = f"emoji_history_{course.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+
+    if request.args.get('gzip') == '1':
+        body = generate_gzip(generate_csv())
+        content_type = 'application/gzip'
+        filename += '.gz'
+    else:
+        body = generate_csv()
+        content_type = 'text/csv; charset=utf-8'
+
+    response = Response(stream_with_context(body), content_type=content_type)
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
+# 性能指标（Prometheus 文本格式）
+@bp.route('/admin/metrics')
+def admin_metrics():
+    token = current_app.config['METRICS_TOKEN']
+    authorized = session.get('user_type') == 1 or (
+        token and request.headers.get('Authorization') == f'Bearer {token}')
+    if not authorized:
+        return Response('forbidden\n', status=403, mimetype='text/plain')
+    if not metrics.enabled:
+        return Response('metrics disabled\n', status=404, mimetype='text/plain')
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@bp.route('/admin/course_info/<string:course_id>')
+def course_info(course_id):
+    # 从数据库加载课程
+    course = Course.query.get_or_404(course_id)
+    # 传给前端
+    return render_template('admin/course_info.html', course=course)
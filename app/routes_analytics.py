@@ -0,0 +1,582 @@
+# app/routes_analytics.py
+# 管理员查看课程统计图表及导出图片
+# 图表在渲染进程池中绘制（见 chart_renderer），本模块和 Web 进程都不导入 matplotlib
+from flask import Blueprint, current_app, render_template, redirect, url_for, flash, request, session, make_response, jsonify
+from app import db
+from app import live_counters, chart_cache, chart_renderer, analytics_log
+from app.chart_cache import chart_key
+from app.chart_renderer import ChartRenderError
+from app.course_report import build_report, report_from_hourly, report_archive
+from app.timeline import build_timeline
+from app.dashboard import get_dashboard
+from app import rollup
+from app.models import User, Course, Student_Course
+from config import EMOJI_TYPE_MAP
+from datetime import datetime, timedelta
+import base64
+import logging
+
+bp = Blueprint('analytics', __name__)
+
+# 管理员查看课程详细信息: 24小时emoji情绪变化曲线图
+@bp.route('/admin/course_emoji_timeline/<string:course_id>', methods=['GET'])
+def course_emoji_timeline(course_id):
+    """
+    管理员查看课程详细信息: 24小时emoji情绪变化图表
+    """
+    if session.get('user_type') != 1:
+        flash('无权限访问管理员功能', 'danger')
+        return redirect(url_for('auth.welcome'))
+    
+    course = Course.query.get_or_404(course_id)
+    teacher = User.query.get(course.teacher_id)
+    student_count = Student_Course.query.filter_by(course_id=course_id).count()
+
+    # 生成24小时情绪变化图表：浏览器端绘制时页面只带数据地址，不在服务器渲染
+    chart_image = None
+    chart_data_url = None
+    zoom_data_url = None
+    if client_charts():
+        # 首次显示最近24小时（读内存计数环），缩放后改用多分辨率时间线接口
+        chart_data_url = url_for('analytics.course_emoji_series', course_id=course_id)
+        zoom_data_url = url_for('analytics.course_emoji_timeline_data', course_id=course_id)
+    else:
+        try:
+            chart_image = generate_emoji_timeline_chart(course_id)
+        except ChartRenderError as e:
+            flash(str(e), 'warning')
+
+    # 全部时间的emoji类型统计和总数（一次按类型聚合汇总表，1-10 类型缺省为 0）
+    report = build_report(course_id, hourly=False)
+
+    return render_template('admin/course_emoji_timeline.html', 
+                         course=course,
+                         teacher=teacher,
+                         student_count=student_count,
+                         total_emojis=report.total,
+                         chart_image=chart_image,
+                         chart_data_url=chart_data_url,
+                         zoom_data_url=zoom_data_url,
+                         emoji_stats=report.emoji_stats,
+                         EMOJI_TYPE_MAP=EMOJI_TYPE_MAP)
+
+def generate_emoji_timeline_chart(course_id, export=False):
+    """
+    生成课程24小时emoji情绪变化曲线图（当前小时及之前23个小时）
+    export=False 返回 base64 图片地址；export=True 返回 CachedChart(png, etag)
+    """
+    # 从内存计数环读取24小时内每个整点、每种类型的数量，不查询数据库
+    hourly_rows = live_counters.hourly_counts(course_id)
+
+    # 诊断信息：只对抽样的请求或管理员加 ?analytics_debug=1 的请求输出
+    if analytics_log.enabled(logging.INFO):
+        end_time = datetime.now()
+        analytics_log.event('timeline_data', course_id=course_id,
+                            start_time=end_time - timedelta(hours=24), end_time=end_time,
+                            buckets=len(hourly_rows), total=sum(n for _, _, n in hourly_rows))
+    if analytics_log.enabled(logging.DEBUG):
+        # 按整点分组的 1-10 类型数量，与曲线图逐点一致（渲染进程中不输出日志）
+        hours = {}
+        for bucket, t, n in hourly_rows:
+            if 1 <= t <= 10:
+                hours.setdefault(bucket.strftime('%Y-%m-%d %H:00'), [0] * 10)[t - 1] += n
+        analytics_log.debug('timeline_buckets', course_id=course_id, hours=hours)
+
+    # 数据未变化时直接使用缓存的图片
+    dpi = 300 if export else 100  # 导出时使用更高分辨率
+    key = chart_key(course_id, 'timeline', '24h', dpi, hourly_rows)
+    chart = chart_cache.get_or_render(
+        key, lambda: chart_renderer.render('timeline', course_id=course_id, hourly_rows=hourly_rows, dpi=dpi))
+    return chart if export else chart_data_uri(chart)
+
+def chart_data_uri(chart):
+    """转换为可直接嵌入页面的 base64 图片地址"""
+    img_data = base64.b64encode(chart.png).decode()
+    return f"data:image/png;base64,{img_data}"
+
+def chart_download(chart, filename):
+    """
+    PNG 下载响应，附带 ETag
+    浏览器携带相同的 If-None-Match 时直接返回 304，不再传输图片
+    """
+    response = make_response(chart.png)
+    response.headers['Content-Type'] = 'image/png'
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    response.set_etag(chart.etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+def client_charts():
+    """页面图表是否交给浏览器绘制（CHART_RENDER_MODE，?render=server 可临时改回服务器端图片）"""
+    return (request.args.get('render') or current_app.config['CHART_RENDER_MODE']) == 'client'
+
+# 接受的时间参数范围：超出后加一天、对齐到时间桶时日期会越界（OverflowError）
+MIN_TIME = datetime(1970, 1, 1)
+MAX_TIME = datetime(9000, 1, 1)
+# 逐小时曲线数据的最长范围（天）
+SERIES_MAX_DAYS = 366
+
+def parse_window(args):
+    """
+    解析 start_date / end_date 参数（YYYY-MM-DD，包含结束日期全天）
+    两个参数都没有时返回 (None, None)；格式错误或只给出一个时抛出 ValueError
+    """
+    start_date_str = args.get('start_date')
+    end_date_str = args.get('end_date')
+    if not start_date_str and not end_date_str:
+        return None, None
+    if not start_date_str or not end_date_str:
+        raise ValueError('start_date 和 end_date 必须同时给出')
+    start_time = _check_time(datetime.strptime(start_date_str, '%Y-%m-%d'))
+    end_time = _check_time(datetime.strptime(end_date_str, '%Y-%m-%d')) + timedelta(days=1) - timedelta(seconds=1)
+    if start_time > end_time:
+        raise ValueError('开始时间不能晚于结束时间')
+    return start_time, end_time
+
+def chart_json(payload, key):
+    """
+    图表数据 JSON 响应，ETag 为输入数据的摘要（与 PNG 缓存键的算法相同）
+    浏览器携带相同的 If-None-Match 时直接返回 304
+    """
+    response = jsonify(payload)
+    response.set_etag(key)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+# 曲线图数据：逐小时 × 类型的数量
+@bp.route('/admin/course_emoji_series/<string:course_id>')
+def course_emoji_series(course_id):
+    """
+    不带时间参数时为最近24小时（读内存计数环，不查询数据库）；
+    带 start_date / end_date 时读小时汇总表，逐小时补 0，范围最长 SERIES_MAX_DAYS 天（更长的范围用可缩放时间线接口）
+    """
+    if session.get('user_type') != 1:
+        return jsonify(error='forbidden'), 403
+    if db.session.get(Course, course_id) is None:
+        return jsonify(error='not_found'), 404
+    try:
+        start_time, end_time = parse_window(request.args)
+    except ValueError:
+        return jsonify(error='invalid_date'), 400
+
+    if start_time is None:
+        # 当前小时及之前 23 个小时，整点变化后横轴随之移动
+        end_time = datetime.now()
+        start_time = rollup.hour_bucket(end_time) - timedelta(hours=23)
+        report = report_from_hourly(course_id, start_time, end_time, live_counters.hourly_counts(course_id))
+        window = ('24h', start_time)
+    elif end_time - start_time > timedelta(days=SERIES_MAX_DAYS):
+        return jsonify(error='invalid_date'), 400
+    else:
+        report = build_report(course_id, start_time, end_time)
+        window = (start_time, end_time)
+    return chart_json(report.series(), chart_key(course_id, 'series', window, 0, report.hourly_rows))
+
+def parse_range(args, course_id):
+    """
+    解析时间线的 start / end 参数（YYYY-MM-DD 或 YYYY-MM-DDTHH:MM[:SS]），end 缺省为现在
+    没有 start 时为 end 之前 hours 小时（缺省 24）；all=1 时从课程第一条表情当天开始
+    格式错误、超出 MIN_TIME ~ MAX_TIME 或开始晚于结束时抛出 ValueError
+    """
+    end_time = _parse_time(args['end']) if args.get('end') else datetime.now()
+    if args.get('all') == '1':
+        start_time = rollup.course_extent(course_id)[0] or end_time - timedelta(hours=24)
+    elif args.get('start'):
+        start_time = _parse_time(args['start'])
+    else:
+        hours = args.get('hours', 24, type=float)
+        if not 0 < hours <= 24 * 366:
+            raise ValueError('hours 超出范围')
+        start_time = end_time - timedelta(hours=hours)
+    if start_time > end_time:
+        raise ValueError('开始时间不能晚于结束时间')
+    return start_time, end_time
+
+def _parse_time(value):
+    # 数据库中的时间都是服务器本地时间，不接受带时区的参数
+    value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        raise ValueError('时间不能带时区')
+    return _check_time(value)
+
+def _check_time(value):
+    if not MIN_TIME <= value < MAX_TIME:
+        raise ValueError('时间超出范围')
+    return value
+
+# 可缩放时间线数据：按范围自动选择时间桶宽度，每条曲线不超过 TIMELINE_MAX_POINTS 个点
+@bp.route('/admin/course_emoji_timeline_data/<string:course_id>')
+def course_emoji_timeline_data(course_id):
+    if session.get('user_type') != 1:
+        return jsonify(error='forbidden'), 403
+    if db.session.get(Course, course_id) is None:
+        return jsonify(error='not_found'), 404
+    try:
+        start_time, end_time = parse_range(request.args, course_id)
+    except ValueError:
+        return jsonify(error='invalid_date'), 400
+
+    max_points = current_app.config['TIMELINE_MAX_POINTS']
+    max_points = max(1, min(request.args.get('points', max_points, type=int), max_points))
+    payload = build_timeline(course_id, start_time, end_time, max_points)
+    # 缺省范围随当前时间移动，ETag 取对齐后的范围，同一时间桶内重复请求可以返回 304
+    window = (payload['start_time'], payload['end_time'], payload['bucket_seconds'])
+    return chart_json(payload, chart_key(course_id, 'zoom', window, 0, payload['counts']))
+
+# 柱状图、饼图数据：各类型数量
+@bp.route('/admin/course_emoji_totals/<string:course_id>')
+def course_emoji_totals(course_id):
+    """带 start_date / end_date 时为该时间范围，否则为全部时间"""
+    if session.get('user_type') != 1:
+        return jsonify(error='forbidden'), 403
+    if db.session.get(Course, course_id) is None:
+        return jsonify(error='not_found'), 404
+    try:
+        start_time, end_time = parse_window(request.args)
+    except ValueError:
+        return jsonify(error='invalid_date'), 400
+
+    report = build_report(course_id, start_time, end_time, hourly=False)
+    return chart_json(report.totals(), chart_key(course_id, 'totals', (start_time, end_time), 0, report.emoji_stats))
+
+# 管理员查看课程详细信息: 自定义时间范围表情数量统计柱状图
+@bp.route('/admin/course_emoji_bar/<string:course_id>', methods=['GET', 'POST'])
+def course_emoji_bar(course_id):
+    if session.get('user_type') != 1:
+        flash('无权限访问管理员功能', 'danger')
+        return redirect(url_for('auth.welcome'))
+    
+    # 获取课程信息
+    course = Course.query.get_or_404(course_id)
+    
+    # 默认时间范围（最近7天）
+    default_end = datetime.now()
+    default_start = default_end - timedelta(days=7)
+    
+    # 初始化变量
+    chart_image = None
+    chart_data_url = None
+    emoji_stats = []
+    start_time = default_start
+    end_time = default_end
+    total_emojis = 0
+    
+    # 处理表单提交
+    if request.method == 'POST':
+        try:
+            # 获取表单中的时间参数
+            start_date_str = request.form.get('start_date')
+            end_date_str = request.form.get('end_date')
+            
+            if start_date_str and end_date_str:
+                start_time = datetime.strptime(start_date_str, '%Y-%m-%d')
+                end_time = datetime.strptime(end_date_str, '%Y-%m-%d') + timedelta(days=1) - timedelta(seconds=1)  # 包含结束日期全天
+
+                # 验证时间范围
+                if start_time > end_time:
+                    flash('开始时间不能晚于结束时间', 'danger')
+                    return redirect(url_for('analytics.course_emoji_bar', course_id=course_id))
+                
+                if start_time > datetime.now():
+                    flash('开始时间不能晚于当前时间', 'danger')
+                    return redirect(url_for('analytics.course_emoji_bar', course_id=course_id))
+
+                # 一次聚合得到统计详情，柱状图和表格共用
+                report = build_report(course_id, start_time, end_time, hourly=False)
+                if not client_charts():
+                    chart_image = generate_emoji_bar_chart(report)
+                elif report.total:
+                    chart_data_url = url_for('analytics.course_emoji_totals', course_id=course_id,
+                                             start_date=start_date_str, end_date=end_date_str)
+                emoji_stats = report.emoji_stats
+                total_emojis = report.total
+                
+                flash(f'成功生成 {start_time.strftime("%Y-%m-%d")} 至 {end_time.strftime("%Y-%m-%d")} 的统计图表', 'success')
+                
+        except ValueError:
+            flash('日期格式错误，请使用 YYYY-MM-DD 格式', 'danger')
+        except Exception as e:
+            flash(f'生成图表时出错: {str(e)}', 'danger')
+
+    return render_template('admin/course_emoji_bar.html', 
+                         course=course,
+                         chart_image=chart_image,
+                         chart_data_url=chart_data_url,
+                         emoji_stats=emoji_stats,
+                         total_emojis=total_emojis,
+                         start_time=start_time,
+                         end_time=end_time,
+                         default_start=default_start.strftime('%Y-%m-%d'),
+                         default_end=default_end.strftime('%Y-%m-%d'),
+                         EMOJI_TYPE_MAP=EMOJI_TYPE_MAP)
+
+# 生成课程表情数量统计柱状图（固定显示1-10类型），数据来自 CourseReport
+def generate_emoji_bar_chart(report, export=False):
+    course_id, start_time, end_time = report.course_id, report.start_time, report.end_time
+    emoji_labels, counts = report.bar_series()
+    
+    # 如果全是 0，返回 None
+    if report.total == 0:
+        return None
+
+    # 数据未变化时直接使用缓存的图片
+    dpi = 300 if export else 100
+    key = chart_key(course_id, 'bar', (start_time, end_time), dpi, counts)
+    chart = chart_cache.get_or_render(
+        key, lambda: chart_renderer.render('bar', course_id=course_id, start_time=start_time, end_time=end_time,
+                                      emoji_labels=emoji_labels, counts=counts, dpi=dpi))
+    return chart if export else chart_data_uri(chart)
+
+# 管理员查看课程表情分布饼图（自定义时间范围）
+@bp.route('/admin/course_emoji_pie/<string:course_id>', methods=['GET', 'POST'])
+def course_emoji_pie(course_id):
+    """
+    管理员查看课程表情分布饼图：根据自定义时间范围生成饼图
+    """
+    if session.get('user_type') != 1:
+        flash('无权限访问管理员功能', 'danger')
+        return redirect(url_for('auth.welcome'))
+    
+    # 获取课程信息
+    course = Course.query.get_or_404(course_id)
+    
+    # 默认时间范围（最近7天）
+    default_end = datetime.now()
+    default_start = default_end - timedelta(days=7)
+    
+    # 初始化变量
+    chart_image = None
+    chart_data_url = None
+    emoji_stats = []
+    start_time = default_start
+    end_time = default_end
+    total_emojis = 0
+    
+    # 处理表单提交
+    if request.method == 'POST':
+        try:
+            # 获取表单中的时间参数
+            start_date_str = request.form.get('start_date')
+            end_date_str = request.form.get('end_date')
+            
+            if start_date_str and end_date_str:
+                start_time = datetime.strptime(start_date_str, '%Y-%m-%d')
+                end_time = datetime.strptime(end_date_str, '%Y-%m-%d') + timedelta(days=1) - timedelta(seconds=1)  # 包含结束日期全天
+                
+                # 验证时间范围
+                if start_time > end_time:
+                    flash('开始时间不能晚于结束时间', 'danger')
+                    return redirect(url_for('analytics.course_emoji_pie', course_id=course_id))
+                
+                if start_time > datetime.now():
+                    flash('开始时间不能晚于当前时间', 'danger')
+                    return redirect(url_for('analytics.course_emoji_pie', course_id=course_id))
+
+                # 一次聚合得到统计详情，饼图和表格共用
+                report = build_report(course_id, start_time, end_time, hourly=False)
+                if not client_charts():
+                    chart_image = generate_emoji_pie_chart(report)
+                elif report.total:
+                    chart_data_url = url_for('analytics.course_emoji_totals', course_id=course_id,
+                                             start_date=start_date_str, end_date=end_date_str)
+                emoji_stats = report.emoji_stats
+                total_emojis = report.total
+                
+                flash(f'成功生成 {start_time.strftime("%Y-%m-%d")} 至 {end_time.strftime("%Y-%m-%d")} 的分布饼图', 'success')
+                
+        except ValueError:
+            flash('日期格式错误，请使用 YYYY-MM-DD 格式', 'danger')
+        except Exception as e:
+            flash(f'生成饼图时出错: {str(e)}', 'danger')
+    
+    return render_template('admin/course_emoji_pie.html', 
+                         course=course,
+                         chart_image=chart_image,
+                         chart_data_url=chart_data_url,
+                         emoji_stats=emoji_stats,
+                         total_emojis=total_emojis,
+                         start_time=start_time,
+                         end_time=end_time,
+                         default_start=default_start.strftime('%Y-%m-%d'),
+                         default_end=default_end.strftime('%Y-%m-%d'),
+                         EMOJI_TYPE_MAP=EMOJI_TYPE_MAP)
+
+# 生成课程表情分布饼图（固定显示1-10类型），数据来自 CourseReport
+def generate_emoji_pie_chart(report, export=False):
+    course_id, start_time, end_time = report.course_id, report.start_time, report.end_time
+    paired_sorted = report.pie_series()  # 把所有0排到后面
+    sorted_types = [p[0] for p in paired_sorted]
+    counts = [p[1] for p in paired_sorted]
+    names = [EMOJI_TYPE_MAP.get(t, f'表情 {t}') for t in sorted_types]
+    # 如果全是 0，返回 None
+    if sum(counts) == 0:
+        return None
+
+    # 数据未变化时直接使用缓存的图片
+    dpi = 300 if export else 100
+    key = chart_key(course_id, 'pie', (start_time, end_time), dpi, paired_sorted)
+    chart = chart_cache.get_or_render(
+        key, lambda: chart_renderer.render('pie', course_id=course_id, start_time=start_time, end_time=end_time,
+                                      names=names, counts=counts, dpi=dpi))
+    return chart if export else chart_data_uri(chart)
+
+# 导出图表功能
+# 导出24小时情绪变化图表
+@bp.route('/admin/export_emoji_timeline/<string:course_id>')
+def export_emoji_timeline(course_id):
+    """导出24小时情绪变化图表为PNG文件"""
+    if session.get('user_type') != 1:
+        flash('无权限访问管理员功能', 'danger')
+        return redirect(url_for('auth.welcome'))
+    
+    course = Course.query.get_or_404(course_id)
+    try:
+        chart = generate_emoji_timeline_chart(course_id, export=True)
+    except ChartRenderError as e:
+        flash(str(e), 'warning')
+        return redirect(url_for('analytics.course_emoji_timeline', course_id=course_id))
+    # 添加检查：如果chart为None，说明没有数据
+    if chart is None:
+        flash('该课程在当前时间范围内没有emoji数据，无法导出图表', 'warning')
+        return redirect(url_for('analytics.course_emoji_timeline', course_id=course_id))
+    filename = f"emoji_timeline_{course_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+    
+    return chart_download(chart, filename)
+
+# 导出柱状图
+@bp.route('/admin/export_emoji_bar/<string:course_id>')
+def export_emoji_bar(course_id):
+    """导出表情数量统计柱状图为PNG文件"""
+    if session.get('user_type') != 1:
+        flash('无权限访问管理员功能', 'danger')
+        return redirect(url_for('auth.welcome'))
+    
+    course = Course.query.get_or_404(course_id)
+    
+    # 获取时间参数
+    start_date_str = request.args.get('start_date')
+    end_date_str = request.args.get('end_date')
+    
+    if not start_date_str or not end_date_str:
+        flash('请提供时间范围参数', 'danger')
+        return redirect(url_for('analytics.course_emoji_bar', course_id=course_id))
+    
+    try:
+        start_time = datetime.strptime(start_date_str, '%Y-%m-%d')
+        end_time = datetime.strptime(end_date_str, '%Y-%m-%d') + timedelta(days=1) - timedelta(seconds=1)  # 包含结束日期全天
+        
+        chart = generate_emoji_bar_chart(build_report(course_id, start_time, end_time, hourly=False), export=True)
+        # 添加检查：如果chart为None，说明没有数据
+        if chart is None:
+            flash('该课程在指定时间范围内没有emoji数据，无法导出图表', 'warning')
+            return redirect(url_for('analytics.course_emoji_bar', course_id=course_id))
+        
+        filename = f"emoji_bar_{course_id}_{start_time.strftime('%Y%m%d')}_to_{end_time.strftime('%Y%m%d')}.png"
+        
+        return chart_download(chart, filename)
+        
+    except Exception as e:
+        flash(f'导出图表时出错: {str(e)}', 'danger')
+        return redirect(url_for('analytics.course_emoji_bar', course_id=course_id))
+
+# 导出饼图
+@bp.route('/admin/export_emoji_pie/<string:course_id>')
+def export_emoji_pie(course_id):
+    """导出表情分布饼图为PNG文件"""
+    if session.get('user_type') != 1:
+        flash('无权限访问管理员功能', 'danger')
+        return redirect(url_for('auth.welcome'))
+    
+    course = Course.query.get_or_404(course_id)
+    
+    # 获取时间参数
+    start_date_str = request.args.get('start_date')
+    end_date_str = request.args.get('end_date')
+    
+    if not start_date_str or not end_date_str:
+        flash('请提供时间范围参数', 'danger')
+        return redirect(url_for('analytics.course_emoji_pie', course_id=course_id))
+    
+    try:
+        start_time = datetime.strptime(start_date_str, '%Y-%m-%d')
+        end_time = datetime.strptime(end_date_str, '%Y-%m-%d') + timedelta(days=1) - timedelta(seconds=1)  # 包含结束日期全天
+        
+        chart = generate_emoji_pie_chart(build_report(course_id, start_time, end_time, hourly=False), export=True)
+        
+        # 添加检查：如果chart为None，说明没有数据
+        if chart is None:
+            flash('该课程在指定时间范围内没有emoji数据，无法导出图表', 'warning')
+            return redirect(url_for('analytics.course_emoji_pie', course_id=course_id))
+        
+        filename = f"emoji_pie_{course_id}_{start_time.strftime('%Y%m%d')}_to_{end_time.strftime('%Y%m%d')}.png"
+        
+        return chart_download(chart, filename)
+        
+    except Exception as e:
+        flash(f'导出图表时出错: {str(e)}', 'danger')
+        return redirect(url_for('analytics.course_emoji_pie', course_id=course_id))
+
+# 导出课程统计报告（ZIP：柱状图、饼图 PNG，逐小时统计 CSV，JSON 摘要），全部数据来自同一次聚合
+@bp.route('/admin/export_course_report/<string:course_id>')
+def export_course_report(course_id):
+    if session.get('user_type') != 1:
+        flash('无权限访问管理员功能', 'danger')
+        return redirect(url_for('auth.welcome'))
+
+    course = Course.query.get_or_404(course_id)
+
+    # 时间范围参数与柱状图、饼图相同，缺省为最近7天
+    try:
+        start_time, end_time = parse_window(request.args)
+    except ValueError:
+        flash('日期格式错误或开始时间晚于结束时间，请使用 YYYY-MM-DD 格式', 'danger')
+        return redirect(url_for('admin.course_info', course_id=course_id))
+    if start_time is None:
+        end_time = datetime.now()
+        start_time = end_time - timedelta(days=7)
+
+    report = build_report(course_id, start_time, end_time)
+
+    # 没有数据时只导出 CSV 和摘要
+    charts = {}
+    if report.total:
+        try:
+            charts['bar.png'] = generate_emoji_bar_chart(report, export=True).png
+            charts['pie.png'] = generate_emoji_pie_chart(report, export=True).png
+        except ChartRenderError as e:
+            flash(str(e), 'warning')
+            return redirect(url_for('admin.course_info', course_id=course_id))
+
+    teacher = User.query.get(course.teacher_id)
+    data = report_archive(report, charts, {
+        'course_name': course.name,
+        'teacher': teacher.name if teacher else None,
+        'student_count': Student_Course.query.filter_by(course_id=course_id).count(),
+    })
+
+    filename = f"course_report_{course_id}_{start_time.strftime('%Y%m%d')}_to_{end_time.strftime('%Y%m%d')}.zip"
+    response = make_response(data)
+    response.headers['Content-Type'] = 'application/zip'
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
+# 管理员全部课程概览：选课人数、表情总数、类型分布、最近24小时活跃度，每项指标一次分组查询，结果短时缓存
+@bp.route('/admin/dashboard')
+def dashboard():
+    if session.get('user_type') != 1:
+        flash('无权限访问管理员功能', 'danger')
+        return redirect(url_for('auth.welcome'))
+
+    return render_template('admin/dashboard.html', dashboard=get_dashboard())
+
+# 全部课程概览数据（JSON）
+@bp.route('/admin/dashboard_data')
+def dashboard_data():
+    if session.get('user_type') != 1:
+        return jsonify(error='forbidden'), 403
+
+    payload = get_dashboard()
+    # 缓存期间数据不变，ETag 取生成时间
+    return chart_json(payload, chart_key(None, 'dashboard', payload['generated_at'], 0, payload['course_count']))
@@ -0,0 +1,281 @@
+# app/routes_teacher.py
+# 教师端：课程列表、表情时间线、实时推送和增量查询
+from flask import Blueprint, current_app, render_template, redirect, url_for, flash, request, session, jsonify, Response
+from datetime import datetime, timedelta
+import time
+
+from app import db, live_feed, emoji_buffer
+from app.ids import id_floor, id_time
+from app.live_feed import emoji_payload, format_sse
+from app import rollup
+from app.models import Course, Emoji
+
+bp = Blueprint('teacher', __name__)
+
+@bp.route('/welcome_teacher')
+def welcome_teacher():
+    return render_template('welcome_teacher.html', user_name=session.get('user_name'))
+
+@bp.route('/teacher/courses')
+def teacher_courses():
+    if session.get('user_type') != 2:
+        flash('无权限访问教师端功能', 'danger')
+        return redirect(url_for('auth.welcome'))
+
+    teacher_id = session['user_id']
+    courses = Course.query.filter_by(teacher_id=teacher_id).all()
+
+    return render_template('teacher/courses.html', courses=courses)
+
+@bp.route('/teacher/course/<course_id>/timeline')
+def teacher_course_timeline(course_id):
+    if session.get('user_type') != 2:
+        flash('无权限访问教师端功能', 'danger')
+        return redirect(url_for('auth.welcome'))
+
+    course = Course.query.get_or_404(course_id)
+
+    # 只加载最近的若干条，之后的新表情由 SSE 推送追加，更早的由"加载更早的记录"按页读取
+    emojis, more = older_emojis(course_id)
+    emojis.reverse()
+    last_id = max((e.id for e in emojis), default='')
+
+    return render_template('teacher/timeline.html', course=course, emojis=emojis, last_id=last_id, more=more)
+
+def older_emojis(course_id, before=None):
+    """
+    按 (时间, id) 倒序取一页表情（TEACHER_TIMELINE_ROWS 条），before 为上一页最早的一条
+    键集分页：条件落在 (课程, 时间) 索引上，翻到多早都不需要 OFFSET。返回 (表情列表, 是否还有更早的)
+    time 为空的旧数据在倒序中排在最后（MySQL、SQLite 的 NULL 排序），翻到最后一页时按 id 读取
+    """
+    limit = current_app.config['TEACHER_TIMELINE_ROWS']
+    query = Emoji.query.filter(Emoji.course_id == course_id,
+                               Emoji.type.between(1, 10))
+    if before is not None and before.time is None:
+        query = query.filter(Emoji.time.is_(None), Emoji.id < before.id)
+    elif before is not None:
+        query = query.filter(db.or_(Emoji.time < before.time,
+                                    db.and_(Emoji.time == before.time, Emoji.id < before.id),
+                                    Emoji.time.is_(None)))
+    rows = query.order_by(Emoji.time.desc(), Emoji.id.desc()).limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
+
+# 加载更早的表情记录（JSON 接口）
+@bp.route('/teacher/course/<course_id>/older')
+def teacher_course_older(course_id):
+    """
+    before 为页面上最早一条表情的 id，返回在它之前的一页：
+      {"emojis": [{"id", "type", "time"}]（按时间倒序）, "more": true}
+    """
+    if session.get('user_type') != 2:
+        return jsonify(error='forbidden'), 403
+
+    if Course.query.get(course_id) is None:
+        return jsonify(error='not_found'), 404
+
+    before = db.session.get(Emoji, request.args.get('before', ''))
+    if before is None or before.course_id != course_id:
+        return jsonify(error='invalid_cursor'), 400
+
+    rows, more = older_emojis(course_id, before)
+    emojis, _ = emoji_payload(rows)
+    return jsonify(emojis=emojis, more=more)
+
+def settled_upper():
+    """
+    表情 ID 在写入缓冲前生成，提交有延迟；按 ID 轮询数据库的游标只推进到 settle 之前，
+    保证游标之前的表情都已经提交，不会被跳过。settle 不小于写缓冲的最长提交延迟
+    """
+    settle = timedelta(seconds=max(current_app.config['EMOJI_DELTA_SETTLE_MS'] / 1000,
+                                   emoji_buffer.max_commit_delay))
+    return id_floor(datetime.now() - settle)
+
+def emojis_after(course_id, since, upper=None, limit=None):
+    """id 在 (since, upper) 之间的表情，按 id 升序；id 按时间递增，只扫描 since 之后写入的行"""
+    query = Emoji.query.filter(Emoji.course_id == course_id,
+                               Emoji.id > since,
+                               Emoji.type.between(1, 10))
+    if upper is not None:
+        query = query.filter(Emoji.id < upper)
+    return query.order_by(Emoji.id).limit(limit).all()
+
+# 课堂表情实时推送（Server-Sent Events）
+@bp.route('/teacher/course/<course_id>/live')
+def teacher_course_live(course_id):
+    """
+    推送事件：
+      emoji   {"emojis": [{"id", "type", "time"}], "deltas": {"类型": 新增数量}}
+      retract {"ids": [...], "deltas": {"类型": -撤回数量}}
+      reset   本连接丢失了消息，浏览器应重新加载页面
+    断线重连时浏览器会带上 Last-Event-ID，据此从数据库补发期间的表情
+    进程内订阅只收到本进程写入的表情；每隔 LIVE_FEED_CATCHUP_SECONDS 秒再按 id 从数据库补齐
+    其它工作进程和 ingest 节点写入的表情（与补发使用同一个查询），重复的由浏览器按 id 去重
+    """
+    if session.get('user_type') != 2:
+        return Response('forbidden', status=403)
+
+    Course.query.get_or_404(course_id)
+
+    # 先订阅再补发，两者之间提交的表情可能重复，由浏览器按 id 去重
+    subscription = live_feed.subscribe(course_id)
+    since = request.headers.get('Last-Event-ID') or request.args.get('since')
+    limit = live_feed.backfill_limit
+    backlog = ([], {})
+    if since:
+        try:
+            rows = emojis_after(course_id, since, limit=limit + 1)
+        except Exception:
+            live_feed.unsubscribe(subscription)
+            raise
+        # 断开太久，补发不完，让浏览器重新加载页面
+        backlog = emoji_payload(rows) if len(rows) <= limit else None
+    # 数据库补齐的游标：只推进到已经确定提交的位置
+    cursor = min(since, settled_upper()) if since else settled_upper()
+    # 流式响应期间不占用数据库连接
+    db.session.remove()
+    app = current_app._get_current_object()
+
+    def catch_up(cursor):
+        """从数据库取 cursor 之后、已确定提交的表情，返回 (表情, 新游标)；补不完时表情为 None"""
+        with app.app_context():
+            try:
+                upper = settled_upper()
+                if cursor >= upper:
+                    return [], cursor
+                rows = emojis_after(course_id, cursor, upper, limit + 1)
+                if len(rows) > limit:
+                    return None, cursor
+                return rows, upper
+            finally:
+                db.session.remove()
+
+    def stream():
+        nonlocal cursor
+        try:
+            yield 'retry: 3000\n\n'
+            if backlog is None:
+                yield format_sse('reset', {})
+                return
+            emojis, deltas = backlog
+            if emojis:
+                yield format_sse('emoji', {
+                    'emojis': emojis,
+                    'deltas': {str(t): n for t, n in deltas.items()}
+                }, max(e['id'] for e in emojis))
+
+            next_catch_up = time.monotonic() + live_feed.catchup
+            while True:
+                timeout = min(live_feed.heartbeat, max(next_catch_up - time.monotonic(), 0))
+                message = subscription.get(timeout=timeout)
+                if subscription.overflowed:
+                    yield format_sse('reset', {})
+                    return
+                if message is not None:
+                    event, event_id, data = message
+                    yield format_sse(event, data, event_id)
+                    continue
+                if time.monotonic() < next_catch_up:
+                    # 心跳注释行，防止代理断开空闲连接
+                    yield ': keepalive\n\n'
+                    continue
+
+                next_catch_up = time.monotonic() + live_feed.catchup
+                rows, cursor = catch_up(cursor)
+                if rows is None:
+                    yield format_sse('reset', {})
+                    return
+                if rows:
+                    emojis, deltas = emoji_payload(rows)
+                    yield format_sse('emoji', {
+                        'emojis': emojis,
+                        'deltas': {str(t): n for t, n in deltas.items()}
+                    }, max(e['id'] for e in emojis))
+                else:
+                    yield ': keepalive\n\n'
+        finally:
+            live_feed.unsubscribe(subscription)
+
+    response = Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # 生成器还没开始执行连接就断开时 finally 不会运行，这里再兜底取消订阅
+    response.call_on_close(lambda: live_feed.unsubscribe(subscription))
+    return response
+
+@bp.route('/teacher/course/<course_id>/stats')
+def teacher_course_stats(course_id):
+    if session.get('user_type') != 2:
+        flash('无权限访问教师端功能', 'danger')
+        return redirect(url_for('auth.welcome'))
+
+    # 从小时汇总表读取各类型总数，只保留有数据的类型
+    stats = [(t, count) for t, count in rollup.type_counts(course_id).items() if count > 0]
+
+    return render_template('teacher/stats.html', stats=stats)
+
+def parse_cursor(value):
+    """
+    解析增量查询的游标：表情 ID（20 位）、毫秒时间戳或 ISO 8601 时间
+    时间会换算成该时刻对应的最小 ID；无法解析时返回 None
+    """
+    try:
+        if id_time(value) is not None:
+            return value
+        if value.isdigit():
+            return id_floor(int(value))
+        sent_at = datetime.fromisoformat(value)
+        if sent_at.tzinfo is not None:
+            sent_at = sent_at.astimezone().replace(tzinfo=None)
+        return id_floor(sent_at)
+    except (ValueError, OverflowError, OSError):
+        return None
+
+# 教师端增量轮询（JSON 接口）
+@bp.route('/teacher/course/<course_id>/delta')
+def teacher_course_delta(course_id):
+    """
+    返回游标之后新增的表情及按类型汇总的增量，以及下一次请求使用的游标：
+      {"cursor": "...", "emojis": [{"id", "type", "time"}], "deltas": {"类型": 数量}, "more": false}
+    不带 since 时不返回表情，而是返回截至游标的各类型总数 "totals"，用于初始化面板
+    more 为 true 表示本次只返回了一部分，应立即用新游标继续请求
+    撤回的表情不会出现在增量里，面板可定期不带 since 请求一次来校正总数
+    """
+    if session.get('user_type') != 2:
+        return jsonify(error='forbidden'), 403
+
+    if Course.query.get(course_id) is None:
+        return jsonify(error='not_found'), 404
+
+    upper = settled_upper()
+
+    since = request.args.get('since', '').strip()
+    if not since:
+        totals = rollup.type_counts(course_id)
+        # 汇总表已包含 upper 之后提交的表情，扣掉它们，避免下一次增量重复计数
+        pending = db.session.query(Emoji.type, db.func.count())\
+                            .filter(Emoji.course_id == course_id,
+                                    Emoji.id >= upper,
+                                    Emoji.type.between(1, 10))\
+                            .group_by(Emoji.type)
+        for emoji_type, n in pending:
+            totals[emoji_type] -= n
+        return jsonify(cursor=upper, emojis=[], deltas={},
+                       totals={str(t): n for t, n in totals.items()}, more=False)
+
+    cursor = parse_cursor(since)
+    if cursor is None:
+        return jsonify(error='invalid_cursor'), 400
+    if cursor >= upper:
+        return jsonify(cursor=cursor, emojis=[], deltas={}, more=False)
+
+    # 按 ID 范围查询：ID 随时间递增，只扫描游标之后写入的行
+    limit = current_app.config['EMOJI_DELTA_MAX_ROWS']
+    rows = emojis_after(course_id, cursor, upper, limit + 1)
+    more = len(rows) > limit
+    rows = rows[:limit]
+    emojis, deltas = emoji_payload(rows)
+    next_cursor = rows[-1].id if more else upper
+
+    return jsonify(cursor=next_cursor, emojis=emojis,
+                   deltas={str(t): n for t, n in deltas.items()}, more=more)
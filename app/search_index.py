@@ -0,0 +1,177 @@
+# app/search_index.py
+"""
+用户和课程的 n-gram 搜索索引（进程内）
+
+管理员各处搜索原来都是 id/name 的 ilike '%关键词%'，前导通配符用不上索引，每次都全表扫描。
+这里在内存里为用户、课程的 id 和 name 建立三元组（trigram）倒排索引：
+关键词拆成三元组后取各倒排表的交集，再逐个确认子串匹配，得到命中的主键，
+查询改为 id IN (...)，走主键。不足三个字符的关键词直接在内存里逐条比对。
+
+命中太多（超过 SEARCH_INDEX_MAX_IDS）时 IN 列表反而更慢，
+这时退回原来的 ilike 条件：命中密集，配合分页的 LIMIT 很快就能取满一页。
+
+同步方式：
+- 本进程内通过 ORM 新增、修改、删除用户或课程，事务提交后增量更新索引
+- 每隔 SEARCH_INDEX_RESYNC_SECONDS 秒从数据库整体重建，纳入其它工作进程和批量 SQL 的修改
+- 绕过 ORM 的批量写入之后调用 invalidate()，下次搜索时重建
+"""
+import threading
+import time
+
+from sqlalchemy import event, or_
+
+GRAM = 3
+
+
+def _grams(text):
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+class NgramIndex:
+    """单张表的倒排索引：三元组 -> 主键集合"""
+
+    def __init__(self):
+        self.docs = {}
+        self.postings = {}
+
+    def add(self, key, fields):
+        self.remove(key)
+        fields = tuple((f or '').lower() for f in fields)
+        self.docs[key] = fields
+        for field in fields:
+            for gram in _grams(field):
+                self.postings.setdefault(gram, set()).add(key)
+
+    def remove(self, key):
+        fields = self.docs.pop(key, None)
+        if fields is None:
+            return
+        for field in fields:
+            for gram in _grams(field):
+                keys = self.postings.get(gram)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self.postings[gram]
+
+    def search(self, term, limit):
+        """返回 id 或 name 包含 term（不区分大小写）的主键；超过 limit 个时返回 None"""
+        term = term.lower()
+        if len(term) < GRAM:
+            candidates = self.docs
+        else:
+            lists = []
+            for gram in _grams(term):
+                keys = self.postings.get(gram)
+                if not keys:
+                    return []
+                lists.append(keys)
+            lists.sort(key=len)
+            candidates = set(lists[0]).intersection(*lists[1:])
+
+        result = []
+        for key in candidates:
+            if any(term in field for field in self.docs[key]):
+                result.append(key)
+                if len(result) > limit:
+                    return None
+        return sorted(result)
+
+
+class SearchIndex:
+    def __init__(self, app=None, db=None):
+        self.db = None
+        self._indexes = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loaded_at = None
+        self.max_ids = 1000
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        app.config.setdefault('SEARCH_INDEX_RESYNC_SECONDS', 60)
+        app.config.setdefault('SEARCH_INDEX_MAX_IDS', 1000)
+        self.db = db
+        self.resync_seconds = app.config['SEARCH_INDEX_RESYNC_SECONDS']
+        self.max_ids = app.config['SEARCH_INDEX_MAX_IDS']
+        app.extensions['search_index'] = self
+
+        if not event.contains(db.session, 'after_flush', self._collect):
+            event.listen(db.session, 'after_flush', self._collect)
+            event.listen(db.session, 'after_commit', self._apply)
+            event.listen(db.session, 'after_soft_rollback', self._discard)
+
+    def condition(self, model, term):
+        """
+        返回 model（User 或 Course）的 id 或 name 包含 term 的查询条件，
+        与原来的 ilike 条件等价，可以和其它过滤条件、分页自由组合
+        """
+        self._ensure_loaded()
+        with self._lock:
+            keys = self._indexes[model.__tablename__].search(term, self.max_ids)
+        if keys is None:
+            return or_(model.id.ilike(f'%{term}%'), model.name.ilike(f'%{term}%'))
+        return model.id.in_(keys)
+
+    def invalidate(self):
+        """下次搜索时从数据库重建（绕过 ORM 的批量修改之后调用）"""
+        with self._lock:
+            self._loaded_at = None
+
+    # ---------------- 加载与同步 ----------------
+
+    def _ensure_loaded(self):
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < self.resync_seconds:
+            return
+        with self._load_lock:
+            # 其它线程可能已经加载完毕
+            loaded_at = self._loaded_at
+            if loaded_at is not None and time.monotonic() - loaded_at < self.resync_seconds:
+                return
+            self._load()
+
+    def _load(self):
+        from app.models import User, Course
+
+        indexes = {}
+        for model in (User, Course):
+            index = NgramIndex()
+            for key, name in self.db.session.query(model.id, model.name):
+                index.add(key, (key, name))
+            indexes[model.__tablename__] = index
+
+        with self._lock:
+            self._indexes = indexes
+            self._loaded_at = time.monotonic()
+
+    def _collect(self, session, flush_context):
+        # flush 之后记下本事务里变动的用户和课程，提交后再写入索引
+        from app.models import User, Course
+
+        changes = session.info.setdefault('search_index_changes', [])
+        for obj in session.new | session.dirty:
+            if isinstance(obj, (User, Course)):
+                changes.append((obj.__tablename__, obj.id, (obj.id, obj.name)))
+        for obj in session.deleted:
+            if isinstance(obj, (User, Course)):
+                changes.append((obj.__tablename__, obj.id, None))
+
+    def _apply(self, session):
+        changes = session.info.pop('search_index_changes', None)
+        if not changes:
+            return
+        with self._lock:
+            if self._loaded_at is None:
+                # 尚未加载，首次搜索时会完整加载
+                return
+            for table, key, fields in changes:
+                index = self._indexes[table]
+                if fields is None:
+                    index.remove(key)
+                else:
+                    index.add(key, fields)
+
+    def _discard(self, session, previous_transaction):
+        session.info.pop('search_index_changes', None)
@@ -0,0 +1,89 @@
+# app/timeline.py
+"""
+可缩放的多分辨率表情时间线
+
+根据查询范围自动选择时间桶宽度：1 分钟、5 分钟、1 小时、1 天，取第一个使点数不超过 max_points 的宽度；
+范围太长时（超过 max_points 天）再把若干天合并为一个点。
+每种宽度读对应粒度的汇总表（5 分钟由分钟汇总表合并），读取的行数最多约为 5 × max_points × 10 类型，
+与范围长短和表情总量无关：整个学期的曲线只读按天汇总表的一百多个桶。
+
+没有数据的时间桶补 0，返回的序列等间隔，浏览器端直接连线。
+"""
+import math
+from datetime import timedelta
+
+from app import rollup
+from config import EMOJI_TYPE_MAP
+
+# (桶宽秒数, 读取的汇总表粒度)
+STEPS = (
+    (60, 'minute'),
+    (300, 'minute'),
+    (3600, 'hour'),
+    (86400, 'day'),
+)
+DAY = 86400
+
+
+def choose_step(start_time, end_time, max_points):
+    """返回 (桶宽秒数, 汇总表粒度, 第一个桶的起点, 桶数量)"""
+    # 1 天以内的桶宽都能整除 1 天，从起始当天零点对齐，桶边界落在整分钟、整 5 分钟、整点上
+    midnight = rollup.day_bucket(start_time)
+    for seconds, resolution in STEPS:
+        first = _floor(start_time, midnight, seconds)
+        n = _bucket_count(first, end_time, seconds)
+        if n <= max_points:
+            return seconds, resolution, first, n
+
+    # 多天合并为一个点，从起始日期对齐
+    days = _bucket_count(midnight, end_time, DAY)
+    seconds = math.ceil(days / max_points) * DAY
+    return seconds, 'day', midnight, _bucket_count(midnight, end_time, seconds)
+
+
+def build_timeline(course_id, start_time, end_time, max_points):
+    """
+    课程在 [start_time, end_time] 内的表情时间线
+    buckets 为各时间桶起点，counts[i] 为第 i 个桶 1-10 类型各自的数量；
+    返回的 start_time / end_time 为对齐到桶边界后的范围，内容只取决于桶的划分和数量
+    """
+    seconds, resolution, first, n = choose_step(start_time, end_time, max_points)
+    types = list(rollup.EMOJI_TYPES)
+    counts = [[0] * len(types) for _ in range(n)]
+    for bucket, emoji_type, count in rollup.bucket_counts(resolution, course_id, first, end_time):
+        i = int((bucket - first).total_seconds() // seconds)
+        if 0 <= i < n:
+            counts[i][emoji_type - 1] += count
+
+    return {
+        'course_id': course_id,
+        'start_time': _format_time(first),
+        'end_time': _format_time(first + timedelta(seconds=seconds * n)),
+        'resolution': step_label(seconds),
+        'bucket_seconds': seconds,
+        'types': types,
+        'names': [EMOJI_TYPE_MAP.get(t, f'表情 {t}') for t in types],
+        'buckets': [(first + timedelta(seconds=seconds * i)).strftime('%Y-%m-%d %H:%M') for i in range(n)],
+        'counts': counts,
+    }
+
+
+def step_label(seconds):
+    """桶宽的显示名称，如 5 分钟、1 小时、3 天"""
+    if seconds % DAY == 0:
+        return f'{seconds // DAY} 天'
+    if seconds % 3600 == 0:
+        return f'{seconds // 3600} 小时'
+    return f'{seconds // 60} 分钟'
+
+
+def _floor(value, origin, seconds):
+    return origin + timedelta(seconds=(value - origin).total_seconds() // seconds * seconds)
+
+
+def _bucket_count(first, end_time, seconds):
+    return int((end_time - first).total_seconds() // seconds) + 1
+
+
+def _format_time(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S')
@@ -0,0 +1,15 @@
+"""
+压测工具：造数据、按场景压测 Emoji 相关页面，并与保存的基线对比
+
+    # 造数据（SQLite 或本地 MySQL），库里已有数据时先加 --reset 清空
+    python -m bench seed --db sqlite:///bench.db --students 5000 --emojis 2000000
+
+    # 用 Flask test client 在进程内压测，结果写入 JSON
+    python -m bench run --db sqlite:///bench.db --requests 200 --out result.json
+
+    # 压测已启动的服务（HTTP），并与基线对比，p95 变慢超过 20% 时返回非零退出码
+    python -m bench run --base-url http://127.0.0.1:5000 --baseline result.json --threshold 0.2
+
+数据库地址通过 DATABASE_URL 环境变量传给 config.py，必须在导入 app 之前设置，
+所以本包的各模块都在函数内部导入 app。
+"""
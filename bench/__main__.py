@@ -0,0 +1,175 @@
+# bench/__main__.py
+"""python -m bench seed|run，参数见 --help"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+from bench import harness, scenarios
+from bench import seed as seed_data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m bench', description='Emoji 压测工具')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('seed', help='造压测数据')
+    p.add_argument('--db', help='数据库地址（SQLAlchemy URL），缺省使用 config.py 中的配置')
+    p.add_argument('--teachers', type=int, default=20)
+    p.add_argument('--courses', type=int, default=50)
+    p.add_argument('--students', type=int, default=2000)
+    p.add_argument('--per-course', type=int, default=60, help='每门课的选课人数')
+    p.add_argument('--emojis', type=int, default=100000)
+    p.add_argument('--days', type=int, default=120, help='表情分布在最近多少天内')
+    p.add_argument('--seed', type=int, default=42, help='随机数种子')
+    p.add_argument('--reset', action='store_true', help='先清空已有数据')
+
+    p = sub.add_parser('run', help='执行压测场景')
+    p.add_argument('--db', help='进程内压测使用的数据库地址')
+    p.add_argument('--base-url', help='压测已启动的服务，例如 http://127.0.0.1:5000')
+    p.add_argument('--server-pid', type=int, help='HTTP 模式下读取该进程的峰值内存')
+    p.add_argument('--scenarios', default='all', help='逗号分隔的场景名，缺省全部')
+    p.add_argument('--requests', type=int, default=200, help='每个场景的请求数')
+    p.add_argument('--concurrency', type=int, default=1)
+    p.add_argument('--warmup', type=int, default=5, help='正式计时前每个场景的预热请求数')
+    p.add_argument('--courses', type=int, help='HTTP 模式下的课程数（进程内模式从数据库读取）')
+    p.add_argument('--students', type=int, help='HTTP 模式下的学生数（进程内模式从数据库读取）')
+    p.add_argument('--isolate', action='store_true', help='每个场景在单独的子进程中执行，分别统计峰值内存')
+    p.add_argument('--out', help='把结果写入 JSON 文件，可作为之后的基线')
+    p.add_argument('--baseline', help='与该 JSON 结果对比')
+    p.add_argument('--threshold', type=float, default=0.2, help='p95 或吞吐量变化超过该比例算退化')
+
+    args = parser.parse_args(argv)
+    # config.py 读取 DATABASE_URL，必须在导入 app 之前设置
+    if args.db:
+        os.environ['DATABASE_URL'] = args.db
+
+    if args.command == 'seed':
+        seed_data.seed(teachers=args.teachers, courses=args.courses, students=args.students,
+                       per_course=args.per_course, emojis=args.emojis, days=args.days,
+                       seed_value=args.seed, reset=args.reset)
+        return 0
+    return run(args)
+
+
+def run(args):
+    if args.isolate:
+        results = run_isolated(args)
+    else:
+        results = run_in_process(args)
+
+    for line in harness.format_table(results):
+        print(line)
+
+    # 进程内模式检查连接池泄漏
+    leaked = {name: r['leaked_connections'] for name, r in results.items() if r.get('leaked_connections')}
+    for name, n in leaked.items():
+        print(f'{name}: 场景结束后仍有 {n} 个数据库连接未归还连接池', file=sys.stderr)
+
+    if args.out:
+        harness.save_results(args.out, results, {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'target': args.base_url or args.db or 'config',
+            'requests': args.requests,
+            'concurrency': args.concurrency
+        })
+
+    if args.baseline:
+        lines, regressed = harness.compare(results, harness.load_results(args.baseline), args.threshold)
+        print()
+        for line in lines:
+            print(line)
+        return 1 if regressed or leaked else 0
+    return 1 if leaked else 0
+
+
+def run_in_process(args):
+    if args.base_url:
+        ctx = scenarios.Context(args.courses or 50, args.students or 2000)
+        after_send = None
+        pool = None
+
+        def make_client(role):
+            return harness.HttpClient(args.base_url, _account(role, ctx))
+    else:
+        from app import create_app, db, emoji_buffer
+        from app.models import Course, User
+
+        app = create_app()
+
+        with app.app_context():
+            courses = db.session.query(Course.id).filter(Course.id.like('bc%')).count()
+            students = db.session.query(User.id).filter(User.id.like('bs%')).count()
+            pool = db.engine.pool
+        if not courses or not students:
+            raise SystemExit('没有压测数据，先执行 python -m bench seed')
+        ctx = scenarios.Context(courses, students)
+        # 发送场景结束时把写缓冲刷入数据库，写库时间计入吞吐量
+        after_send = emoji_buffer.flush
+
+        def make_client(role):
+            return harness.LocalClient(app, _account(role, ctx), role)
+
+    results = {}
+    for scenario in _selected(args, ctx):
+        checked_out = pool.checkedout() if pool is not None else None
+        if args.warmup:
+            harness.run_scenario(scenario, make_client, args.warmup, 1)
+        after = after_send if scenario.name == 'send_emoji' else None
+        results[scenario.name] = harness.run_scenario(
+            scenario, make_client, args.requests, args.concurrency,
+            server_pid=args.server_pid, after=after)
+        if checked_out is not None:
+            # 场景结束后仍被占用的连接说明有请求没有归还连接池
+            results[scenario.name]['leaked_connections'] = pool.checkedout() - checked_out
+        print(f'{scenario.name} 完成', file=sys.stderr)
+    return results
+
+
+def run_isolated(args):
+    # 先不导入 app，场景名只用于拼子进程参数
+    names = [s.name for s in _selected(args, scenarios.Context(1, 1))]
+    results = {}
+    for name in names:
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, 'result.json')
+            cmd = [sys.executable, '-m', 'bench', 'run', '--scenarios', name, '--out', out,
+                   '--requests', str(args.requests), '--concurrency', str(args.concurrency),
+                   '--warmup', str(args.warmup)]
+            for flag in ('db', 'base_url', 'server_pid', 'courses', 'students'):
+                value = getattr(args, flag)
+                if value is not None:
+                    cmd += ['--' + flag.replace('_', '-'), str(value)]
+            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+            results.update(harness.load_results(out))
+    return results
+
+
+def _selected(args, ctx):
+    available = scenarios.build(ctx)
+    if args.scenarios == 'all':
+        return available
+    wanted = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    by_name = {s.name: s for s in available}
+    unknown = [name for name in wanted if name not in by_name]
+    if unknown:
+        raise SystemExit(f'未知场景: {", ".join(unknown)}；可选: {", ".join(by_name)}')
+    return [by_name[name] for name in wanted]
+
+
+_account_counter = iter(range(sys.maxsize))
+
+
+def _account(role, ctx):
+    if role == 1:
+        return seed_data.ADMIN_ID
+    if role == 2:
+        return seed_data.teacher_id(0)
+    # 每个学生线程用不同的账号
+    return seed_data.student_id(next(_account_counter) % ctx.students)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
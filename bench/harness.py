@@ -0,0 +1,200 @@
+# bench/harness.py
+"""
+压测执行：客户端、计时、统计和基线对比
+
+两种客户端接口一致（get / post 返回 (状态码, 响应字节数)）：
+- LocalClient 用 Flask test client 在进程内请求，直接写 session 模拟登录
+- HttpClient 通过 HTTP 请求已启动的服务，走 /login 表单登录
+"""
+import http.cookiejar
+import json
+import os
+import re
+import resource
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from bench import seed as seed_data
+
+
+class LocalClient:
+    def __init__(self, app, user_id, user_type):
+        self.client = app.test_client()
+        with self.client.session_transaction() as session:
+            session['user_id'] = user_id
+            session['user_name'] = user_id
+            session['user_type'] = user_type
+
+    def get(self, path):
+        return self._read(self.client.get(path, buffered=False))
+
+    def post(self, path, data):
+        return self._read(self.client.post(path, data=data))
+
+    @staticmethod
+    def _read(response):
+        # 流式响应要读完才算请求结束
+        size = sum(len(chunk) for chunk in response.response)
+        response.close()
+        return response.status_code, size
+
+
+class HttpClient:
+    def __init__(self, base_url, user_id, password=seed_data.PASSWORD):
+        self.base_url = base_url.rstrip('/')
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+        self._login(user_id, password)
+
+    def get(self, path):
+        return self._open(urllib.request.Request(self._url(path)))
+
+    def post(self, path, data):
+        body = urllib.parse.urlencode(data).encode('utf-8')
+        return self._open(urllib.request.Request(self._url(path), data=body))
+
+    def _url(self, path):
+        # 路径和查询参数里可能有中文
+        return self.base_url + urllib.parse.quote(path, safe='/?=&%')
+
+    def _open(self, request):
+        try:
+            with self.opener.open(request) as response:
+                return response.status, len(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, len(e.read())
+
+    def _login(self, user_id, password):
+        with self.opener.open(self.base_url + '/login') as response:
+            html = response.read().decode('utf-8')
+        match = re.search(r'name="csrf_token"[^>]*value="([^"]+)"', html)
+        data = {'user_id': user_id, 'key': password}
+        if match:
+            data['csrf_token'] = match.group(1)
+        self.post('/login', data)
+
+
+def percentile(sorted_values, p):
+    """最近秩法求百分位数"""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(p / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+
+def peak_rss_mb(pid=None):
+    """进程的峰值常驻内存（MB）；pid 为空时取当前进程"""
+    if pid is not None:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024.0
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return usage / (1024.0 * 1024.0) if sys.platform == 'darwin' else usage / 1024.0
+
+
+def run_scenario(scenario, make_client, requests, concurrency, server_pid=None, after=None):
+    """
+    并发执行 requests 次 scenario.request，返回统计结果
+    make_client(role) 为每个线程创建一个登录好的客户端
+    """
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def worker():
+        client = make_client(scenario.role)
+        local = []
+        local_errors = 0
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            start = time.perf_counter()
+            try:
+                status, _ = scenario.request(client, i)
+            except Exception:
+                status = 599
+            local.append(time.perf_counter() - start)
+            if status >= 400:
+                local_errors += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if after is not None:
+        after()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ms = [v * 1000 for v in latencies]
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'concurrency': concurrency,
+        'p50_ms': round(percentile(ms, 50), 3),
+        'p95_ms': round(percentile(ms, 95), 3),
+        'p99_ms': round(percentile(ms, 99), 3),
+        'max_ms': round(ms[-1], 3) if ms else 0.0,
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        'peak_rss_mb': round(peak_rss_mb(server_pid), 1)
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    与基线逐个场景对比 p95 和吞吐量，返回 (报告行, 是否有退化)
+    p95 变慢或吞吐量下降超过 threshold（比例）算退化
+    """
+    lines = []
+    regressed = False
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            lines.append(f'{name:<16} 基线中没有该场景')
+            continue
+        p95_ratio = current['p95_ms'] / base['p95_ms'] if base['p95_ms'] else 1.0
+        rps_ratio = current['throughput_rps'] / base['throughput_rps'] if base['throughput_rps'] else 1.0
+        bad = p95_ratio > 1 + threshold or rps_ratio < 1 - threshold
+        regressed = regressed or bad
+        lines.append(f'{name:<16} p95 {base["p95_ms"]:>9.2f} -> {current["p95_ms"]:>9.2f} ms ({p95_ratio:5.2f}x)  '
+                     f'吞吐 {base["throughput_rps"]:>8.1f} -> {current["throughput_rps"]:>8.1f} rps ({rps_ratio:5.2f}x)'
+                     + ('  退化' if bad else ''))
+    return lines, regressed
+
+
+def format_table(results):
+    header = (f'{"场景":<16}{"请求":>7}{"错误":>6}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}'
+              f'{"rps":>10}{"峰值 RSS MB":>13}')
+    lines = [header]
+    for name, r in results.items():
+        lines.append(f'{name:<16}{r["requests"]:>7}{r["errors"]:>6}{r["p50_ms"]:>10.2f}{r["p95_ms"]:>10.2f}'
+                     f'{r["p99_ms"]:>10.2f}{r["throughput_rps"]:>10.1f}{r["peak_rss_mb"]:>13.1f}')
+    return lines
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['scenarios']
+
+
+def save_results(path, results, meta):
+    data = {'meta': meta, 'scenarios': results}
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
@@ -0,0 +1,76 @@
+# bench/scenarios.py
+"""
+压测场景
+
+每个场景指定登录角色（1 管理员 / 2 教师 / 3 学生）和一次请求的内容，
+课程、学生按请求序号轮换，避免所有请求都打在同一门课（同一份图表缓存）上。
+"""
+import random
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from bench import seed as seed_data
+
+Scenario = namedtuple('Scenario', ['name', 'role', 'request'])
+
+
+class Context:
+    """场景共用的数据：已造好的课程数、学生数"""
+
+    def __init__(self, courses, students):
+        self.courses = courses
+        self.students = students
+
+    def course(self, i):
+        return seed_data.course_id(i % self.courses)
+
+
+def build(ctx):
+    rng = random.Random(7)
+    today = datetime.now()
+    bar_range = {
+        'start_date': (today - timedelta(days=30)).strftime('%Y-%m-%d'),
+        'end_date': today.strftime('%Y-%m-%d')
+    }
+
+    def send_emoji(client, i):
+        return client.post(f'/student/course/{ctx.course(i)}/send_emoji',
+                           {'emoji_type': rng.randint(1, 10)})
+
+    def timeline(client, i):
+        return client.get(f'/admin/course_emoji_timeline/{ctx.course(i)}')
+
+    def bar(client, i):
+        return client.post(f'/admin/course_emoji_bar/{ctx.course(i)}', bar_range)
+
+    def pie(client, i):
+        return client.post(f'/admin/course_emoji_pie/{ctx.course(i)}', bar_range)
+
+    def export_csv(client, i):
+        return client.get(f'/admin/export_emoji_history_csv/{ctx.course(i)}')
+
+    def teacher_list(client, i):
+        return client.get('/admin/teacher')
+
+    def student_list(client, i):
+        # 翻到靠后的页，检验游标分页的耗时是否与页码无关
+        after = seed_data.student_id(i * 97 % ctx.students)
+        return client.get(f'/admin/student?after={after}')
+
+    def student_search(client, i):
+        return client.get(f'/admin/student?search=学生{i % ctx.students}')
+
+    def course_list(client, i):
+        return client.get('/admin/course')
+
+    return [
+        Scenario('send_emoji', 3, send_emoji),
+        Scenario('timeline', 1, timeline),
+        Scenario('bar', 1, bar),
+        Scenario('pie', 1, pie),
+        Scenario('export_csv', 1, export_csv),
+        Scenario('teacher_list', 1, teacher_list),
+        Scenario('student_list', 1, student_list),
+        Scenario('student_search', 1, student_search),
+        Scenario('course_list', 1, course_list),
+    ]
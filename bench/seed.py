@@ -0,0 +1,169 @@
+# bench/seed.py
+"""
+造压测数据
+
+- 每门课每周 1~2 次课，每次 2 小时，绝大多数表情集中在上课时间，开头和结尾各有一个小高峰
+- 其余少量表情分布在白天的课后时间
+- 表情类型按常见程度加权（微笑、思考最多，生气最少）
+- 表情 ID 按发送时间生成（app.ids.id_for_time），与线上数据的主键顺序一致
+
+写入使用 Core 的批量 INSERT，写完后重建小时汇总表。
+"""
+import random
+import time
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+PASSWORD = 'bench'
+ADMIN_ID = 'badmin'
+INSERT_BATCH = 10000
+
+# 类型 1-10 的相对频率（与 config.EMOJI_TYPE_MAP 对应）
+TYPE_WEIGHTS = [18, 22, 10, 8, 12, 5, 10, 4, 7, 4]
+
+
+def teacher_id(i):
+    return f'bt{i:05d}'
+
+
+def student_id(i):
+    return f'bs{i:07d}'
+
+
+def course_id(i):
+    return f'bc{i:05d}'
+
+
+def seed(teachers=20, courses=50, students=2000, per_course=60, emojis=100000,
+         days=120, after_class_ratio=0.15, seed_value=42, reset=False, echo=print):
+    """写入压测数据，返回各表的行数"""
+    from sqlalchemy import insert
+
+    from app import create_app, db, rollup
+    from app.ids import id_for_time
+    from app.models import User, Course, Student_Course, Emoji, EmojiMinuteCount, EmojiHourlyCount, EmojiDailyCount
+
+    app = create_app()
+
+    rng = random.Random(seed_value)
+    started = time.perf_counter()
+
+    with app.app_context():
+        db.create_all()
+        if reset:
+            for model in (EmojiMinuteCount, EmojiHourlyCount, EmojiDailyCount, Emoji, Student_Course, Course, User):
+                db.session.query(model).delete()
+            db.session.commit()
+        if db.session.query(User.id).filter(User.id == ADMIN_ID).first() is not None:
+            raise SystemExit('数据库里已经有压测数据，加 --reset 清空后重新生成')
+
+        _tune_sqlite(db)
+
+        # 密码哈希很慢，所有账号共用一个
+        key = generate_password_hash(PASSWORD)
+        users = [{'id': ADMIN_ID, 'key': key, 'name': '压测管理员', 'user_type': 1}]
+        users += [{'id': teacher_id(i), 'key': key, 'name': f'教师{i}', 'user_type': 2}
+                  for i in range(teachers)]
+        users += [{'id': student_id(i), 'key': key, 'name': f'学生{i}', 'user_type': 3}
+                  for i in range(students)]
+        _insert(db, insert(User), users)
+
+        course_rows = [{'id': course_id(i), 'teacher_id': teacher_id(i % teachers), 'name': f'压测课程{i}'}
+                       for i in range(courses)]
+        _insert(db, insert(Course), course_rows)
+
+        # 每门课随机选 per_course 个学生
+        roster = {}
+        enrollments = []
+        for i in range(courses):
+            members = rng.sample(range(students), min(per_course, students))
+            roster[course_id(i)] = [student_id(s) for s in members]
+            enrollments += [{'student_id': student_id(s), 'course_id': course_id(i)} for s in members]
+        _insert(db, insert(Student_Course), enrollments)
+        db.session.commit()
+        echo(f'用户 {len(users)}，课程 {courses}，选课 {len(enrollments)}')
+
+        # 表情按课程均分，逐门课生成并分批写入，内存里不会同时保存全部数据
+        end = datetime.now().replace(minute=0, second=0, microsecond=0)
+        start = end - timedelta(days=days)
+        written = 0
+        for i in range(courses):
+            cid = course_id(i)
+            n = emojis // courses + (1 if i < emojis % courses else 0)
+            if not roster[cid] or n == 0:
+                continue
+            sessions = _class_sessions(rng, start, end)
+            batch = []
+            for _ in range(n):
+                if sessions and rng.random() >= after_class_ratio:
+                    sent_at = _in_class_time(rng, rng.choice(sessions))
+                else:
+                    sent_at = _after_class_time(rng, start, days)
+                batch.append({
+                    'id': id_for_time(sent_at, rng.getrandbits(51)),
+                    'student_id': rng.choice(roster[cid]),
+                    'course_id': cid,
+                    'time': sent_at,
+                    'type': rng.choices(range(1, 11), weights=TYPE_WEIGHTS)[0]
+                })
+                if len(batch) >= INSERT_BATCH:
+                    written += _insert(db, insert(Emoji), batch)
+                    batch = []
+            written += _insert(db, insert(Emoji), batch)
+            db.session.commit()
+            echo(f'  {cid}: 累计写入表情 {written}')
+
+        buckets = rollup.rebuild(db.session)
+        db.session.commit()
+        echo(f"表情 {written}，汇总桶 分钟 {buckets['minute']} / 小时 {buckets['hour']} / 天 {buckets['day']}，"
+             f'耗时 {time.perf_counter() - started:.1f}s')
+
+    return {'users': len(users), 'courses': courses, 'enrollments': len(enrollments), 'emojis': written}
+
+
+def _insert(db, statement, rows):
+    for i in range(0, len(rows), INSERT_BATCH):
+        db.session.execute(statement, rows[i:i + INSERT_BATCH])
+    return len(rows)
+
+
+def _tune_sqlite(db):
+    # 造数据时关闭 SQLite 的同步写盘，速度能快一个数量级
+    if db.engine.dialect.name == 'sqlite':
+        db.session.execute(db.text('PRAGMA journal_mode=WAL'))
+        db.session.execute(db.text('PRAGMA synchronous=OFF'))
+
+
+def _class_sessions(rng, start, end):
+    """一门课在 [start, end) 内的上课时间段：每周 1~2 次，每次 2 小时"""
+    slots = [(rng.randrange(5), rng.choice([8, 10, 14, 16, 19]))
+             for _ in range(rng.choice([1, 2]))]
+    sessions = []
+    monday = start - timedelta(days=start.weekday())
+    week = monday.replace(hour=0)
+    while week < end:
+        for weekday, hour in slots:
+            begin = week + timedelta(days=weekday, hours=hour)
+            if start <= begin and begin + timedelta(hours=2) <= end:
+                sessions.append(begin)
+        week += timedelta(weeks=1)
+    return sessions
+
+
+def _in_class_time(rng, begin):
+    # 开课 10 分钟和下课前 10 分钟各占约 25%，其余均匀分布在课上
+    r = rng.random()
+    if r < 0.25:
+        offset = rng.uniform(0, 600)
+    elif r < 0.5:
+        offset = rng.uniform(6600, 7200)
+    else:
+        offset = rng.uniform(0, 7200)
+    return begin + timedelta(seconds=offset)
+
+
+def _after_class_time(rng, start, days):
+    # 课后时间集中在 8 点到 23 点
+    day = start + timedelta(days=rng.randrange(days))
+    return day.replace(hour=0) + timedelta(hours=rng.uniform(8, 23))
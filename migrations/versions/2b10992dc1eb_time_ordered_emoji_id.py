@@ -0,0 +1,68 @@
+"""Time-ordered emoji id.
+
+Revision ID: 2b10992dc1eb
+Revises: ea804c9d9721
+Create Date: 2026-10-18 10:12:31.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.ids import id_for_time, ID_LENGTH
+
+# revision identifiers, used by Alembic.
+revision = '2b10992dc1eb'
+down_revision = 'ea804c9d9721'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    # 第一步：Emoji_ID 由 String(10) 扩展为 String(20)
+    with op.batch_alter_table('emoji', schema=None) as batch_op:
+        batch_op.alter_column('Emoji_ID',
+               existing_type=sa.String(length=10),
+               type_=sa.String(length=20),
+               existing_nullable=False)
+
+    # 第二步：按发送时间重新生成旧的 uuid4 截断 ID，使主键整体按时间有序
+    # 按主键分批处理，避免一次性把整张表读进内存
+    bind = op.get_bind()
+    emoji = sa.table('emoji',
+                     sa.column('Emoji_ID', sa.String(20)),
+                     sa.column('time', sa.DateTime))
+    last_id = ''
+    while True:
+        rows = bind.execute(
+            sa.select(emoji.c.Emoji_ID, emoji.c.time)
+              .where(emoji.c.Emoji_ID > last_id,
+                     sa.func.length(emoji.c.Emoji_ID) < ID_LENGTH)
+              .order_by(emoji.c.Emoji_ID)
+              .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for old_id, sent_at in rows:
+            if sent_at is None:
+                continue
+            bind.execute(
+                emoji.update()
+                     .where(emoji.c.Emoji_ID == old_id)
+                     .values(Emoji_ID=id_for_time(sent_at))
+            )
+        last_id = rows[-1][0]
+
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    # 注意：新 ID 为 20 位，降级前需确保表中没有超过 10 位的 ID，否则会被截断或报错
+    with op.batch_alter_table('emoji', schema=None) as batch_op:
+        batch_op.alter_column('Emoji_ID',
+               existing_type=sa.String(length=20),
+               type_=sa.String(length=10),
+               existing_nullable=False)
+
+    # ### end Alembic commands ###
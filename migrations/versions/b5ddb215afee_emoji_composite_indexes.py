@@ -0,0 +1,40 @@
+"""Composite indexes for emoji analytics queries.
+
+Revision ID: b5ddb215afee
+Revises: e528c759a47b
+Create Date: 2026-10-18 13:26:05.377190
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5ddb215afee'
+down_revision = 'e528c759a47b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 升级后可执行 `flask explain-indexes` 检查各查询的执行计划是否用上了这些索引
+    with op.batch_alter_table('emoji', schema=None) as batch_op:
+        # Course_ID = ? AND time BETWEEN ? AND ? AND type BETWEEN 1 AND 10
+        batch_op.create_index('ix_emoji_course_time_type', ['Course_ID', 'time', 'type'], unique=False)
+        # Student_ID = ? ORDER BY time DESC
+        batch_op.create_index('ix_emoji_student_time', ['Student_ID', 'time'], unique=False)
+
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    # MySQL 在建立复合索引后会删掉外键自动创建的单列索引，
+    # 删除复合索引前先补回外键所需的索引，否则会报 "needed in a foreign key constraint"
+    if op.get_bind().dialect.name == 'mysql':
+        op.create_index('FK_Reference_4', 'emoji', ['Course_ID'], unique=False)
+        op.create_index('FK_Reference_5', 'emoji', ['Student_ID'], unique=False)
+
+    with op.batch_alter_table('emoji', schema=None) as batch_op:
+        batch_op.drop_index('ix_emoji_student_time')
+        batch_op.drop_index('ix_emoji_course_time_type')
+
+    # ### end Alembic commands ###
@@ -0,0 +1,35 @@
+"""Emoji hourly rollup table.
+
+Revision ID: e528c759a47b
+Revises: 2b10992dc1eb
+Create Date: 2026-10-18 11:03:47.918225
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e528c759a47b'
+down_revision = '2b10992dc1eb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 按 (课程, 整点, 类型) 计数的汇总表
+    # 升级后执行 `flask rebuild-rollup` 从已有的 emoji 数据回填
+    op.create_table('emoji_hourly_count',
+    sa.Column('Course_ID', sa.String(length=20), nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('type', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['Course_ID'], ['course.Course_ID'], ),
+    sa.PrimaryKeyConstraint('Course_ID', 'bucket', 'type')
+    )
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    op.drop_table('emoji_hourly_count')
+    # ### end Alembic commands ###
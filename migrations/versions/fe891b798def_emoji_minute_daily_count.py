@@ -0,0 +1,44 @@
+"""Emoji minute and daily rollup tables.
+
+Revision ID: fe891b798def
+Revises: b5ddb215afee
+Create Date: 2026-10-18 21:02:15.604318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'fe891b798def'
+down_revision = 'b5ddb215afee'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 按 (课程, 分钟, 类型) 和 (课程, 日期, 类型) 计数的汇总表，与小时汇总表一起增量维护
+    # 升级后执行 `flask rebuild-rollup` 从已有的 emoji 数据回填
+    op.create_table('emoji_minute_count',
+    sa.Column('Course_ID', sa.String(length=20), nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('type', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['Course_ID'], ['course.Course_ID'], ),
+    sa.PrimaryKeyConstraint('Course_ID', 'bucket', 'type')
+    )
+    op.create_table('emoji_daily_count',
+    sa.Column('Course_ID', sa.String(length=20), nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('type', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['Course_ID'], ['course.Course_ID'], ),
+    sa.PrimaryKeyConstraint('Course_ID', 'bucket', 'type')
+    )
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    op.drop_table('emoji_daily_count')
+    op.drop_table('emoji_minute_count')
+    # ### end Alembic commands ###
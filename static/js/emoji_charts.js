@@ -0,0 +1,269 @@
+// static/js/emoji_charts.js
+// 浏览器端绘制课程统计图（SVG），数据来自 /admin/course_emoji_series、/admin/course_emoji_timeline_data
+// 和 /admin/course_emoji_totals。
+// 页面中的 <div class="emoji-chart" data-kind="timeline|bar|pie" data-src="..." data-title="..."> 会在加载后自动绘制。
+// 曲线图带 data-zoom-src 时可以缩放：<form class="emoji-chart-zoom" data-target="容器 id"> 选择范围，或点击某个时间桶放大。
+(function () {
+    var SVG_NS = 'http://www.w3.org/2000/svg';
+    // 与 matplotlib 的 tab10 配色一致
+    var COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd',
+                  '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf'];
+    var WIDTH = 960;
+    var HEIGHT = 420;
+    var MARGIN = {top: 40, right: 170, bottom: 70, left: 50};
+
+    function node(name, attrs, parent) {
+        var el = document.createElementNS(SVG_NS, name);
+        for (var key in attrs) {
+            if (attrs.hasOwnProperty(key)) {
+                el.setAttribute(key, attrs[key]);
+            }
+        }
+        if (parent) {
+            parent.appendChild(el);
+        }
+        return el;
+    }
+
+    function text(parent, x, y, value, attrs) {
+        var el = node('text', attrs || {}, parent);
+        el.setAttribute('x', x);
+        el.setAttribute('y', y);
+        el.textContent = value;
+        return el;
+    }
+
+    function canvas(container, title) {
+        container.innerHTML = '';
+        var svg = node('svg', {
+            viewBox: '0 0 ' + WIDTH + ' ' + HEIGHT,
+            width: '100%',
+            'font-size': 12,
+            'font-family': 'sans-serif'
+        }, container);
+        text(svg, WIDTH / 2, 22, title, {'text-anchor': 'middle', 'font-size': 16, 'font-weight': 'bold'});
+        return svg;
+    }
+
+    function message(container, value) {
+        container.innerHTML = '<p class="text-muted">' + value + '</p>';
+    }
+
+    // 纵轴：从 0 开始的整数刻度
+    function yAxis(svg, maxValue, plotHeight) {
+        var top = Math.max(1, maxValue);
+        var step = Math.max(1, Math.ceil(top / 8));
+        top = Math.ceil(top / step) * step;
+        for (var v = 0; v <= top; v += step) {
+            var y = MARGIN.top + plotHeight - v / top * plotHeight;
+            node('line', {x1: MARGIN.left, x2: WIDTH - MARGIN.right, y1: y, y2: y, stroke: '#e5e5e5'}, svg);
+            text(svg, MARGIN.left - 6, y + 4, v, {'text-anchor': 'end'});
+        }
+        return top;
+    }
+
+    function xLabel(svg, x, value) {
+        var y = HEIGHT - MARGIN.bottom + 14;
+        text(svg, x, y, value, {'text-anchor': 'end', transform: 'rotate(-45 ' + x + ' ' + y + ')'});
+    }
+
+    function legend(svg, names, labels) {
+        for (var i = 0; i < names.length; i++) {
+            var y = MARGIN.top + i * 20;
+            node('rect', {x: WIDTH - MARGIN.right + 16, y: y, width: 12, height: 12, fill: COLORS[i % COLORS.length]}, svg);
+            text(svg, WIDTH - MARGIN.right + 34, y + 10, labels ? labels[i] : names[i]);
+        }
+    }
+
+    // 曲线图：data.buckets（逐小时数据为 data.hours）为各时间桶起点，data.counts[i] 为该时间桶各类型的数量
+    function timeline(container, data, title) {
+        var buckets = data.buckets || data.hours;
+        var total = 0;
+        data.counts.forEach(function (row) {
+            row.forEach(function (v) { total += v; });
+        });
+        if (!total) {
+            return message(container, '暂无表情数据');
+        }
+        // 可缩放时间线的数据带范围和桶宽
+        if (data.resolution) {
+            title += '  ' + data.start_time.slice(0, 16) + ' ~ ' + data.end_time.slice(0, 16) +
+                '（每 ' + data.resolution + '）';
+        }
+        var svg = canvas(container, title);
+        var plotWidth = WIDTH - MARGIN.left - MARGIN.right;
+        var plotHeight = HEIGHT - MARGIN.top - MARGIN.bottom;
+        var maxValue = 0;
+        data.counts.forEach(function (row) {
+            maxValue = Math.max.apply(null, [maxValue].concat(row));
+        });
+        var top = yAxis(svg, maxValue, plotHeight);
+        var step = buckets.length > 1 ? plotWidth / (buckets.length - 1) : 0;
+        var x = function (i) { return MARGIN.left + (buckets.length > 1 ? i * step : plotWidth / 2); };
+        var y = function (v) { return MARGIN.top + plotHeight - v / top * plotHeight; };
+        // 按天分桶时只显示日期，跨天时标签带日期
+        var sameDay = buckets[0].slice(0, 10) === buckets[buckets.length - 1].slice(0, 10);
+        var every = Math.max(1, Math.ceil(buckets.length / 24));
+        buckets.forEach(function (bucket, i) {
+            if (i % every === 0) {
+                xLabel(svg, x(i), data.bucket_seconds >= 86400 ? bucket.slice(5, 10)
+                    : sameDay ? bucket.slice(11, 16) : bucket.slice(5, 16));
+            }
+        });
+        data.types.forEach(function (type, t) {
+            var color = COLORS[t % COLORS.length];
+            var points = data.counts.map(function (row, i) { return x(i) + ',' + y(row[t]); });
+            node('polyline', {points: points.join(' '), fill: 'none', stroke: color, 'stroke-width': 2}, svg);
+            // 点多时只画折线
+            if (buckets.length <= 100) {
+                data.counts.forEach(function (row, i) {
+                    node('circle', {cx: x(i), cy: y(row[t]), r: 3, fill: color}, svg);
+                });
+            }
+        });
+        legend(svg, data.names);
+
+        // 点击某个时间桶放大到该桶的范围（已是 1 分钟的桶时不再放大）
+        if (container.getAttribute('data-zoom-src') && data.bucket_seconds > 60) {
+            svg.style.cursor = 'zoom-in';
+            svg.addEventListener('click', function (event) {
+                var rect = svg.getBoundingClientRect();
+                var px = (event.clientX - rect.left) * WIDTH / rect.width;
+                var i = step ? Math.round((px - MARGIN.left) / step) : 0;
+                if (i < 0 || i >= buckets.length) {
+                    return;
+                }
+                var start = parseTime(buckets[i]);
+                zoom(container, {
+                    start: formatTime(start),
+                    end: formatTime(new Date(start.getTime() + data.bucket_seconds * 1000))
+                });
+            });
+        }
+    }
+
+    // 各类型数量柱状图
+    function bar(container, data, title) {
+        var svg = canvas(container, title);
+        var plotWidth = WIDTH - MARGIN.left - MARGIN.right;
+        var plotHeight = HEIGHT - MARGIN.top - MARGIN.bottom;
+        var top = yAxis(svg, Math.max.apply(null, data.counts), plotHeight);
+        var slot = plotWidth / data.counts.length;
+        data.counts.forEach(function (count, i) {
+            var h = count / top * plotHeight;
+            var x = MARGIN.left + i * slot + slot * 0.15;
+            var y = MARGIN.top + plotHeight - h;
+            node('rect', {x: x, y: y, width: slot * 0.7, height: h, fill: COLORS[i % COLORS.length]}, svg);
+            text(svg, x + slot * 0.35, y - 4, count, {'text-anchor': 'middle'});
+            xLabel(svg, x + slot * 0.35, data.names[i]);
+        });
+    }
+
+    // 各类型占比饼图，数量为 0 的类型只出现在图例中
+    function pie(container, data, title) {
+        if (!data.total) {
+            return message(container, '该时间范围内没有 emoji 数据。');
+        }
+        var svg = canvas(container, title);
+        var cx = MARGIN.left + (WIDTH - MARGIN.left - MARGIN.right) / 2;
+        var cy = MARGIN.top + (HEIGHT - MARGIN.top - 20) / 2;
+        var r = (HEIGHT - MARGIN.top - 40) / 2;
+        var angle = -Math.PI / 2;
+        data.counts.forEach(function (count, i) {
+            if (!count) {
+                return;
+            }
+            var sweep = count / data.total * Math.PI * 2;
+            var color = COLORS[i % COLORS.length];
+            if (count === data.total) {
+                node('circle', {cx: cx, cy: cy, r: r, fill: color}, svg);
+            } else {
+                var x1 = cx + r * Math.cos(angle), y1 = cy + r * Math.sin(angle);
+                var x2 = cx + r * Math.cos(angle + sweep), y2 = cy + r * Math.sin(angle + sweep);
+                node('path', {
+                    d: 'M' + cx + ',' + cy + ' L' + x1 + ',' + y1 +
+                       ' A' + r + ',' + r + ' 0 ' + (sweep > Math.PI ? 1 : 0) + ' 1 ' + x2 + ',' + y2 + ' Z',
+                    fill: color, stroke: '#fff', 'stroke-width': 1
+                }, svg);
+            }
+            angle += sweep;
+        });
+        legend(svg, data.names, data.names.map(function (name, i) {
+            return name + ': ' + data.counts[i] + ' 次 (' + (data.counts[i] / data.total * 100).toFixed(1) + '%)';
+        }));
+    }
+
+    var RENDERERS = {timeline: timeline, bar: bar, pie: pie};
+
+    function pad(n) {
+        return (n < 10 ? '0' : '') + n;
+    }
+
+    // 'YYYY-MM-DD HH:MM' <-> 本地时间；服务器接收 YYYY-MM-DDTHH:MM
+    function parseTime(value) {
+        var p = value.split(/[-: T]/);
+        return new Date(+p[0], p[1] - 1, +p[2], +p[3] || 0, +p[4] || 0);
+    }
+
+    function formatTime(d) {
+        return d.getFullYear() + '-' + pad(d.getMonth() + 1) + '-' + pad(d.getDate()) +
+            'T' + pad(d.getHours()) + ':' + pad(d.getMinutes());
+    }
+
+    // 以 params 为查询参数请求 data-zoom-src 并重新绘制
+    function zoom(container, params) {
+        var query = [];
+        for (var key in params) {
+            if (params.hasOwnProperty(key) && params[key]) {
+                query.push(encodeURIComponent(key) + '=' + encodeURIComponent(params[key]));
+            }
+        }
+        container.setAttribute('data-src', container.getAttribute('data-zoom-src') + '?' + query.join('&'));
+        load(container);
+    }
+
+    // 范围表单：带 data-hours 或 data-all 的按钮为预设范围，提交表单时使用 start / end 输入框
+    function bindZoom(form) {
+        var container = document.getElementById(form.getAttribute('data-target'));
+        form.addEventListener('submit', function (event) {
+            event.preventDefault();
+            zoom(container, {start: form.elements.start.value, end: form.elements.end.value});
+        });
+        var presets = form.querySelectorAll('[data-hours], [data-all]');
+        for (var i = 0; i < presets.length; i++) {
+            presets[i].addEventListener('click', function () {
+                zoom(container, this.hasAttribute('data-all') ? {all: 1} : {hours: this.getAttribute('data-hours')});
+            });
+        }
+    }
+
+    function load(container) {
+        message(container, '图表加载中...');
+        fetch(container.getAttribute('data-src'), {credentials: 'same-origin'})
+            .then(function (response) {
+                if (!response.ok) {
+                    throw new Error(response.status);
+                }
+                return response.json();
+            })
+            .then(function (data) {
+                RENDERERS[container.getAttribute('data-kind')](container, data, container.getAttribute('data-title') || '');
+            })
+            .catch(function () {
+                message(container, '图表数据加载失败，请刷新页面重试');
+            });
+    }
+
+    window.EmojiCharts = {load: load, zoom: zoom, timeline: timeline, bar: bar, pie: pie};
+
+    document.addEventListener('DOMContentLoaded', function () {
+        var charts = document.querySelectorAll('.emoji-chart[data-src]');
+        for (var i = 0; i < charts.length; i++) {
+            load(charts[i]);
+        }
+        var forms = document.querySelectorAll('form.emoji-chart-zoom');
+        for (var j = 0; j < forms.length; j++) {
+            bindZoom(forms[j]);
+        }
+    });
+})();